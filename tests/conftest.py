@@ -0,0 +1,88 @@
+"""
+Gedeelde setup voor de tool-tests.
+
+De tools draaien normaal binnen de CyNiT hub, die cynit_theme en cynit_layout
+levert. Zijn die hier niet importeerbaar, dan registreren we minimale
+stand-ins (enkel wat useful_links/voica1 gebruiken), met de config in een tmp-map.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tempfile
+import types
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "tools"))
+
+# geen warm-up bij import: de tests zetten eerst hun eigen paden
+os.environ.setdefault("CYNIT_NO_WARM", "1")
+
+
+def _install_hub_stubs() -> None:
+    try:
+        import cynit_theme  # noqa: F401
+        import cynit_layout  # noqa: F401
+        return
+    except ImportError:
+        pass
+
+    base_dir = Path(tempfile.mkdtemp(prefix="cynit-tests-"))
+    theme = types.ModuleType("cynit_theme")
+    theme.BASE_DIR = base_dir
+    theme.CONFIG_DIR = base_dir / "config"
+
+    defaults = {
+        "colors": {"background": "#000000", "general_fg": "#00ff00", "button_fg": "#00bcd4", "title": "#0099ff"},
+        "ui": {"font_main": "Consolas"},
+    }
+
+    def load_settings_live(fallback):
+        settings = {**defaults, **fallback}
+        path = theme.CONFIG_DIR / "settings.json"
+        if path.exists():
+            settings.update(json.loads(path.read_text(encoding="utf-8")))
+        return settings
+
+    def get_module_cfg(settings, name):
+        cfg = settings.get(name)
+        return cfg if isinstance(cfg, dict) else {}
+
+    def save_settings(settings):
+        (theme.CONFIG_DIR / "settings.json").write_text(json.dumps(settings), encoding="utf-8")
+        return True
+
+    theme.load_settings_live = load_settings_live
+    theme.load_settings = lambda: load_settings_live({})
+    theme.load_tools = lambda: {"tools": []}
+    theme.get_module_cfg = get_module_cfg
+    theme.save_settings = save_settings
+
+    layout = types.ModuleType("cynit_layout")
+    layout.common_css = lambda settings: ""
+    layout.common_js = lambda: ""
+    layout.header_html = lambda settings, tools=None, title="", right_html="": f"<header>{title}</header>"
+    layout.footer_html = lambda: "<footer></footer>"
+
+    sys.modules["cynit_theme"] = theme
+    sys.modules["cynit_layout"] = layout
+
+
+_install_hub_stubs()
+
+
+@pytest.fixture
+def client_for():
+    """Flask test client voor een register_web_routes(app, ...) van een tool."""
+    from flask import Flask
+
+    def make(register, *args, **kwargs):
+        app = Flask(__name__)
+        register(app, *args, **kwargs)
+        return app.test_client()
+
+    return make
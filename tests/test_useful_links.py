@@ -0,0 +1,115 @@
+import json
+import threading
+
+import pytest
+
+import useful_links as ul
+
+
+def _link(link_id, name, **extra):
+    row = {
+        "id": link_id,
+        "name": name,
+        "url": f"https://{name.lower()}.example",
+        "category": ul.FALLBACK_CATEGORY,
+        "info": "",
+        "created": "2026-01-01T00:00:00",
+        "updated": "2026-01-01T00:00:00",
+    }
+    row.update(extra)
+    return row
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """useful_links met een eigen db/settings in tmp_path en lege caches."""
+    monkeypatch.setattr(ul, "DATA_PATH", tmp_path / "useful_links.json")
+    monkeypatch.setattr(ul, "SETTINGS_PATH", tmp_path / "settings.json")
+    monkeypatch.setattr(ul, "_PENDING_DB", None)
+    monkeypatch.setattr(ul, "_WRITING", None)
+    monkeypatch.setattr(ul, "_DB_MEMO", (None, None))
+    monkeypatch.setattr(ul, "_SETTINGS_MEMO", (None, None, None))
+    ul._invalidate_page_cache()
+    yield ul.DATA_PATH
+    ul._flush_pending()
+
+
+@pytest.fixture
+def client(db_path, client_for):
+    return client_for(ul.register_web_routes, {}, tools=[])
+
+
+def _write_file(path, links):
+    db = ul._default_db()
+    db["links"] = links
+    path.write_text(json.dumps(db), encoding="utf-8")
+
+
+def test_pending_save_is_a_snapshot(db_path):
+    db = ul.load_db()
+    db["links"].append(_link("1", "Alpha"))
+    ul.save_db(db)
+
+    # wijziging na save_db mag niet meer meekomen
+    db["links"][0]["name"] = "Changed"
+
+    assert ul.load_db()["links"][0]["name"] == "Alpha"
+    ul._flush_pending()
+    assert json.loads(db_path.read_text(encoding="utf-8"))["links"][0]["name"] == "Alpha"
+
+
+def test_load_during_write_sees_new_db(db_path, monkeypatch):
+    _write_file(db_path, [_link("1", "Old")])
+    db = ul.load_db()
+    db["links"][0]["name"] = "New"
+    ul.save_db(db)
+
+    started, release = threading.Event(), threading.Event()
+    real_write = ul._write_db_file
+
+    def slow_write(data):
+        started.set()
+        release.wait(5)
+        real_write(data)
+
+    monkeypatch.setattr(ul, "_write_db_file", slow_write)
+    writer = threading.Thread(target=ul._flush_pending)
+    writer.start()
+    try:
+        assert started.wait(5)
+        # file is nog de oude, de write loopt nog: load_db mag niet blokkeren
+        assert ul.load_db()["links"][0]["name"] == "New"
+    finally:
+        release.set()
+        writer.join(5)
+
+    assert json.loads(db_path.read_text(encoding="utf-8"))["links"][0]["name"] == "New"
+
+
+def test_page_reflects_save_db(client):
+    db = ul.load_db()
+    db["links"].append(_link("1", "Foo"))
+    ul.save_db(db)
+    assert ">Foo<" in client.get("/links").get_data(as_text=True)
+
+    db = ul.load_db()
+    db["links"][0]["name"] = "Bar"
+    ul.save_db(db)
+    html = client.get("/links").get_data(as_text=True)
+    assert ">Bar<" in html and ">Foo<" not in html
+
+
+def test_page_reflects_hand_edit(client, db_path):
+    _write_file(db_path, [_link("1", "Foo")])
+    assert ">Foo<" in client.get("/links").get_data(as_text=True)
+
+    # handmatig bewerkt, 'updated' ongewijzigd; andere grootte => nieuwe stamp
+    _write_file(db_path, [_link("1", "Barbaz")])
+    html = client.get("/links").get_data(as_text=True)
+    assert ">Barbaz<" in html and ">Foo<" not in html
+
+
+def test_null_info_renders_empty(client, db_path):
+    _write_file(db_path, [_link("1", "Foo", info=None)])
+    html = client.get("/links").get_data(as_text=True)
+    assert 'data-info=""' in html and 'data-info="None"' not in html
@@ -0,0 +1,53 @@
+import pytest
+
+import voica1
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / "VOICA1"
+    root.mkdir()
+    return root
+
+
+@pytest.fixture
+def client(root, client_for):
+    return client_for(voica1.register_web_routes, {}, [], {"root_base_dir": str(root)})
+
+
+def _batch(parent, name):
+    batch = parent / name
+    batch.mkdir(parents=True)
+    (batch / f"{name}.zip").write_bytes(b"PK-zip")
+    return batch
+
+
+def _download(client, base_dir):
+    return client.post("/voica1/download_zip", data={"base_dir": str(base_dir)})
+
+
+def test_download_zip_serves_batch_zip(client, root):
+    batch = _batch(root / "2026" / "10", "16")
+    resp = _download(client, batch)
+    assert resp.status_code == 200
+    assert resp.data == b"PK-zip"
+    assert "16.zip" in resp.headers["Content-Disposition"]
+
+
+def test_download_zip_rejects_dir_outside_root(client, root, tmp_path):
+    outside = _batch(tmp_path, "outside")
+    assert _download(client, outside).status_code == 400
+
+
+def test_download_zip_rejects_dotdot(client, root, tmp_path):
+    _batch(tmp_path, "outside")
+    sneaky = f"{root}/../outside"
+    assert _download(client, sneaky).status_code == 400
+
+
+def test_download_zip_requires_base_dir(client):
+    assert _download(client, "").status_code == 400
+
+
+def test_download_zip_missing_zip(client, root):
+    assert _download(client, root).status_code == 404
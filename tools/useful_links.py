@@ -37,31 +37,134 @@ useful_links.py - CyNiT Tools module
 
 from __future__ import annotations
 
+import atexit
+import hashlib
 import json
+import logging
+import os
+import sys
+import threading
 import uuid
+from collections import Counter
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, List, Tuple, Optional
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Tuple, Optional
 
-from flask import Flask, request, render_template_string, redirect, url_for
+from flask import Flask, Response, request, redirect, send_from_directory, stream_with_context, url_for
+from jinja2 import Environment, Template
+from markupsafe import Markup
+
+try:  # optioneel: sneller encoden, direct naar bytes
+    import orjson
+except ImportError:
+    orjson = None
 
 import cynit_theme
 import cynit_layout
 
 
+logger = logging.getLogger("useful_links")
+
 BASE_DIR: Path = cynit_theme.BASE_DIR
 CONFIG_DIR: Path = cynit_theme.CONFIG_DIR
 DATA_PATH: Path = CONFIG_DIR / "useful_links.json"
+SETTINGS_PATH: Path = CONFIG_DIR / "settings.json"
 
 
 FALLBACK_CATEGORY = "General"
 DEFAULT_COLOR = "#00f700"
 
+# Gerenderde /links pagina's, key = (db stamp, settings stamp, cat, error, msg).
+# Stamps wijzigen bij elke schrijfactie; save_db leegt de cache bovendien expliciet
+# (writes binnen dezelfde mtime-tick).
+_PAGE_CACHE: Dict[Tuple[Any, ...], str] = {}
+_PAGE_CACHE_MAX = 64
+
+# Gerenderde linkkaarten (zie _card_html); zelfde lock als de page-cache.
+_CARD_HTML_CACHE: Dict[Tuple[str, str, str, str], str] = {}
+_CARD_HTML_CACHE_MAX = 4096
+_PAGE_CACHE_LOCK = threading.Lock()
+_SAVE_LOCK = threading.Lock()
+# Eén write tegelijk, in de volgorde van de snapshots (zie _flush_pending).
+_WRITE_LOCK = threading.Lock()
+
+# Uitgestelde writes: snelle reeksen wijzigingen (kleurkiezer, sliders) worden
+# samengevoegd tot één write na _SAVE_DELAY seconden. Tot dan leest load_db
+# de nog niet weggeschreven db uit _PENDING_DB (geserialiseerd bij save_db,
+# dus los van de dict van de caller), of uit _WRITING zolang de write loopt.
+# _DB_GEN telt elke save_db.
+_SAVE_DELAY = 0.2
+_PENDING_DB: Optional[bytes] = None
+_WRITING: Optional[bytes] = None
+_SAVE_TIMER: Optional[threading.Timer] = None
+_DB_GEN = 0
+
+# Compact wegschrijven; CYNIT_PRETTY=1 voor leesbare JSON (handmatig bewerken).
+_PRETTY = os.environ.get("CYNIT_PRETTY", "0") not in ("", "0")
+
+# Vaste CSS voor /links (versie = mtime in de URL, zie _STATIC_CSS_VERSION).
+_STATIC_DIR = Path(__file__).resolve().parent / "static"
+
+# Aantal template-events per gestreamde chunk van /links.
+_STREAM_BUFFER = 64
+
+# Pagina-CSS per content-hash, geserveerd als /links/css/<hash>.css (immutable).
+_CSS_CACHE: Dict[str, str] = {}
+_CSS_CACHE_MAX = 8
+
+# Laatst geladen (genormaliseerde) db voor de GET-route: (_db_version(), db).
+_DB_MEMO: Tuple[Optional[Tuple[Any, ...]], Optional[Dict[str, Any]]] = (None, None)
+
+# Laatst gelezen settings.json: (stamp, fallback, settings). Zie _load_settings_cached.
+_SETTINGS_MEMO: Tuple[Optional[Tuple[int, int]], Optional[Dict[str, Any]], Optional[Dict[str, Any]]] = (None, None, None)
+
 
 def _now_iso() -> str:
     return datetime.now().isoformat(timespec="seconds")
 
 
+_DIRS_READY = False
+
+
+def _ensure_dirs() -> None:
+    """CONFIG_DIR één keer per proces aanmaken i.p.v. bij elke load/save."""
+    global _DIRS_READY
+    if not _DIRS_READY:
+        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+        _DIRS_READY = True
+
+
+def _file_stamp(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+_STATIC_CSS_VERSION = (_file_stamp(_STATIC_DIR / "useful_links.css") or (0, 0))[0]
+
+
+def _page_cache_get(key: Tuple[Any, ...]) -> Optional[str]:
+    with _PAGE_CACHE_LOCK:
+        return _PAGE_CACHE.get(key)
+
+
+def _page_cache_put(key: Tuple[Any, ...], html: str) -> None:
+    with _PAGE_CACHE_LOCK:
+        if len(_PAGE_CACHE) >= _PAGE_CACHE_MAX:
+            _PAGE_CACHE.pop(next(iter(_PAGE_CACHE)))
+        _PAGE_CACHE[key] = html
+
+
+def _invalidate_page_cache() -> None:
+    with _PAGE_CACHE_LOCK:
+        _PAGE_CACHE.clear()
+        _CARD_HTML_CACHE.clear()
+
+
 def _default_db() -> Dict[str, Any]:
     return {
         "version": 10,
@@ -77,31 +180,148 @@ def _default_db() -> Dict[str, Any]:
     }
 
 
+def _persistable(db: Dict[str, Any]) -> Dict[str, Any]:
+    """Afgeleide in-memory velden (prefix '_', bv. _index_counts) niet wegschrijven."""
+    return {k: v for k, v in db.items() if not k.startswith("_")}
+
+
+def _load_db_bytes(raw: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw.decode("utf-8"))
+
+
+def _dump_db_bytes(data: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if _PRETTY else 0)
+    if _PRETTY:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _write_db_file(data: bytes) -> None:
+    # Eerst naast het echte bestand schrijven en dan atomair vervangen:
+    # een crash halverwege laat useful_links.json nooit half geschreven achter.
+    _ensure_dirs()
+    tmp_path = DATA_PATH.with_suffix(".json.tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp_path, DATA_PATH)
+
+
+def _flush_pending() -> None:
+    """
+    Uitgestelde db nu wegschrijven (timer, atexit of expliciet). De fsync
+    gebeurt buiten _SAVE_LOCK: load_db/save_db wachten niet op de schijf.
+    """
+    global _PENDING_DB, _SAVE_TIMER, _WRITING
+    with _WRITE_LOCK:
+        with _SAVE_LOCK:
+            if _SAVE_TIMER is not None:
+                _SAVE_TIMER.cancel()
+                _SAVE_TIMER = None
+            data, _PENDING_DB = _PENDING_DB, None
+            if data is None:
+                return
+            _WRITING = data
+        try:
+            _write_db_file(data)
+        finally:
+            with _SAVE_LOCK:
+                if _WRITING is data:
+                    _WRITING = None
+
+
+atexit.register(_flush_pending)
+
+
 def save_db(db: Dict[str, Any]) -> None:
-    CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-    DATA_PATH.write_text(json.dumps(db, indent=2, ensure_ascii=False), encoding="utf-8")
+    """
+    db in geheugen vastleggen en de write inplannen (debounce van _SAVE_DELAY):
+    de route hoeft niet op fsync te wachten. Volgende load_db ziet de nieuwe db meteen.
+    """
+    global _DB_MEMO, _PENDING_DB, _SAVE_TIMER, _DB_GEN
+    with _SAVE_LOCK:
+        # nu al serialiseren: latere wijzigingen aan db door de caller
+        # komen zo niet (of half) mee in de uitgestelde write
+        _PENDING_DB = _dump_db_bytes(_persistable(db))
+        _DB_GEN += 1
+        if _SAVE_TIMER is not None:
+            _SAVE_TIMER.cancel()
+        _SAVE_TIMER = threading.Timer(_SAVE_DELAY, _flush_pending)
+        _SAVE_TIMER.daemon = True
+        _SAVE_TIMER.start()
+
+    _DB_MEMO = (None, None)
+    _invalidate_page_cache()
+
+
+def _db_version() -> Tuple[Optional[Tuple[int, int]], int]:
+    """Versie van de db voor caches: bestandsstempel + aantal saves in dit proces."""
+    return _file_stamp(DATA_PATH), _DB_GEN
 
 
 def _normalize_category_name(name: str) -> str:
-    return (name or "").strip()
+    # geïnterneerd: veel rijen delen dezelfde paar categorienamen
+    return sys.intern((name or "").strip())
 
 
-def load_db() -> Dict[str, Any]:
-    CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+_LINK_STR_FIELDS = ("id", "name", "url", "category", "info", "created", "updated")
+
+
+def _is_canonical_link(row: Any, categories: Dict[str, Any]) -> bool:
+    """
+    Snelle check: rij zoals save_db hem wegschrijft (alle velden str, al gestript,
+    categorie bestaat met kleur). Zulke rijen hoeven niet door de normalisatie.
+    """
+    if type(row) is not dict:
+        return False
+    for k in _LINK_STR_FIELDS:
+        if type(row.get(k)) is not str:
+            return False
+    name, url, cat = row["name"], row["url"], row["category"]
+    if not row["id"] or not name or not url or not cat:
+        return False
+    if name != name.strip() or url != url.strip() or cat != cat.strip():
+        return False
+    meta = categories.get(cat)
+    return type(meta) is dict and "color" in meta
+
 
-    if not DATA_PATH.exists():
+def load_db() -> Dict[str, Any]:
+    _ensure_dirs()
+
+    with _SAVE_LOCK:
+        pending = _PENDING_DB if _PENDING_DB is not None else _WRITING
+    if pending is not None:
+        # nog niet (volledig) weggeschreven: dit is de meest recente db (al
+        # genormaliseerd opgeslagen, dus de normalisatie hieronder is de snelle pass)
+        db = _load_db_bytes(pending)
+    elif not DATA_PATH.exists():
         db = _default_db()
         save_db(db)
+        _attach_index(db, {})
         return db
-
-    try:
-        db = json.loads(DATA_PATH.read_text(encoding="utf-8"))
-    except Exception:
-        db = _default_db()
+    else:
+        try:
+            db = _load_db_bytes(DATA_PATH.read_bytes())
+        except Exception:
+            db = _default_db()
 
     if not isinstance(db, dict):
         db = _default_db()
 
+    # Verse/lege standaard-db: niets te normaliseren of te tellen.
+    if db == _default_db():
+        _attach_index(db, {})
+        return db
+
     changed = False
 
     if not isinstance(db.get("links"), list):
@@ -124,7 +344,7 @@ def load_db() -> Dict[str, Any]:
     if not isinstance(db["prefs"].get("default_category"), str) or not db["prefs"]["default_category"].strip():
         db["prefs"]["default_category"] = FALLBACK_CATEGORY
         changed = True
-    db["prefs"]["default_category"] = db["prefs"]["default_category"].strip()
+    db["prefs"]["default_category"] = sys.intern(db["prefs"]["default_category"].strip())
 
     vm = (db["prefs"].get("view_mode") or "comfortable").strip().lower()
     if vm not in ("comfortable", "compact"):
@@ -133,6 +353,9 @@ def load_db() -> Dict[str, Any]:
     else:
         db["prefs"]["view_mode"] = vm
 
+    # Categorienamen interneren (JSON levert per voorkomen een nieuwe str).
+    db["categories"] = {sys.intern(k): v for k, v in db["categories"].items()}
+
     for cat, meta in list(db["categories"].items()):
         if not isinstance(meta, dict):
             db["categories"][cat] = {"color": DEFAULT_COLOR}
@@ -149,7 +372,15 @@ def load_db() -> Dict[str, Any]:
         changed = True
 
     normalized_links: List[Dict[str, Any]] = []
+    counts: Dict[str, int] = {}
+    categories = db["categories"]
     for row in db["links"]:
+        if _is_canonical_link(row, categories):
+            normalized_links.append(row)
+            cat = row["category"] = sys.intern(row["category"])
+            counts[cat] = counts.get(cat, 0) + 1
+            continue
+
         if not isinstance(row, dict):
             changed = True
             continue
@@ -159,6 +390,10 @@ def load_db() -> Dict[str, Any]:
         if not name or not url:
             changed = True
             continue
+        # gestript terugschrijven: daarna kunnen alle paden r["name"]/r["url"] direct gebruiken
+        if row["name"] != name or row["url"] != url:
+            row["name"], row["url"] = name, url
+            changed = True
 
         if not row.get("id"):
             row["id"] = str(uuid.uuid4())
@@ -172,7 +407,10 @@ def load_db() -> Dict[str, Any]:
             row["category"] = cat
             changed = True
 
-        row.setdefault("info", "")
+        # "info": null (handmatig bewerkt) => "", anders rendert/bewaart de kaart 'None'
+        if not isinstance(row.get("info"), str):
+            row["info"] = ""
+            changed = True
         row.setdefault("created", _now_iso())
         row.setdefault("updated", row.get("created", _now_iso()))
 
@@ -185,6 +423,7 @@ def load_db() -> Dict[str, Any]:
         db["categories"][cat].setdefault("color", DEFAULT_COLOR)
 
         normalized_links.append(row)
+        counts[cat] = counts.get(cat, 0) + 1
 
     if normalized_links != db["links"]:
         db["links"] = normalized_links
@@ -193,24 +432,121 @@ def load_db() -> Dict[str, Any]:
     if changed:
         save_db(db)
 
+    _attach_index(db, counts)
+    return db
+
+
+def _attach_index(db: Dict[str, Any], counts: Dict[str, int]) -> None:
+    """
+    Index uit de normalisatie-pass bewaren, zodat _counts_by_cat/_categories
+    niet opnieuw over alle links moeten lopen. Wordt niet weggeschreven (save_db).
+    """
+    db["_index_counts"] = counts
+    db["_index_cats"] = tuple(sorted(set(counts) | db["categories"].keys(), key=str.casefold))
+
+
+def _ensure_category(db: Dict[str, Any], cat: str, default_color: str = DEFAULT_COLOR) -> Dict[str, Any]:
+    """
+    Categorie-entry {"color": ...} garanderen en teruggeven.
+    db komt uit load_db, dus db["categories"] is altijd een dict.
+    """
+    cats = db["categories"]
+    entry = cats.get(cat)
+    if not isinstance(entry, dict):
+        entry = cats[cat] = {"color": default_color}
+    else:
+        entry.setdefault("color", default_color)
+    return entry
+
+
+def _link_columns(db: Dict[str, Any]) -> Dict[str, List[Any]]:
+    """
+    Links als kolommen (struct-of-arrays), al gesorteerd op (categorie, naam):
+    rows[i] hoort bij cats[i]; by_cat geeft per categorie de rijen in dezelfde
+    volgorde. Eén keer per db-versie opgebouwd (lazy, zit in
+    de gememoiseerde db), zodat de GET-route per request alleen nog filtert.
+    """
+    cols = db.get("_columns")
+    if cols is None:
+        links = db.get("links", [])
+        cats = [r["category"] for r in links]
+        cats_lc = [c.lower() for c in cats]
+        names_lc = [r["name"].lower() for r in links]
+        order = sorted(range(len(links)), key=lambda i: (cats_lc[i], names_lc[i]))
+        by_cat: Dict[str, List[Dict[str, Any]]] = {}
+        for i in order:
+            by_cat.setdefault(cats[i], []).append(links[i])
+        cols = db["_columns"] = {
+            "rows": [links[i] for i in order],
+            "cats": [cats[i] for i in order],
+            "by_cat": by_cat,
+        }
+    return cols
+
+
+def _load_db_cached() -> Dict[str, Any]:
+    """
+    load_db() voor de GET-route: hergebruikt de genormaliseerde db (incl. index)
+    zolang useful_links.json niet wijzigt. Alleen lezen, niet muteren!
+    """
+    global _DB_MEMO
+    version = _db_version()
+    memo_version, memo_db = _DB_MEMO
+    if version[0] is not None and memo_db is not None and memo_version == version:
+        return memo_db
+
+    db = load_db()
+    # Nieuwe db (ook na handmatig bewerken van useful_links.json, zonder save_db):
+    # gecachte kaarten kunnen verouderd zijn, 'updated' wordt dan niet altijd gezet.
+    with _PAGE_CACHE_LOCK:
+        _CARD_HTML_CACHE.clear()
+    # versie van vóór het laden: wijzigt er intussen iets, dan is de memo
+    # meteen verouderd i.p.v. de oude db onder de nieuwe versie te bewaren
+    _DB_MEMO = (version, db)
     return db
 
 
+def _load_settings_cached(fallback: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    cynit_theme.load_settings_live() maar alleen opnieuw lezen/parsen als
+    settings.json (mtime/size) gewijzigd is. Alleen lezen, niet muteren!
+    Routes die settings aanpassen gebruiken load_settings_live zelf (eigen kopie).
+    Enkel een hit voor precies dezelfde fallback (zelfde object): het resultaat
+    hangt ervan af.
+    """
+    global _SETTINGS_MEMO
+    stamp = _file_stamp(SETTINGS_PATH)
+    memo_stamp, memo_fallback, memo_settings = _SETTINGS_MEMO
+    if stamp is not None and memo_settings is not None and memo_stamp == stamp and memo_fallback is fallback:
+        return memo_settings
+
+    live_settings = cynit_theme.load_settings_live(fallback)
+    _SETTINGS_MEMO = (stamp, fallback, live_settings) if stamp is not None else (None, None, None)
+    return live_settings
+
+
 def _counts_by_cat(db: Dict[str, Any]) -> Dict[str, int]:
-    counts: Dict[str, int] = {}
+    if "_index_counts" in db:
+        return db["_index_counts"]
+
     default_cat = (db.get("prefs", {}).get("default_category") or FALLBACK_CATEGORY).strip() or FALLBACK_CATEGORY
-    for r in db.get("links", []):
-        if not isinstance(r, dict):
-            continue
-        c = _normalize_category_name(r.get("category") or "") or default_cat
-        counts[c] = counts.get(c, 0) + 1
-    return counts
+    # Counter telt in C (_count_elements) i.p.v. een Python-lus met counts.get()
+    return Counter(
+        _normalize_category_name(r.get("category") or "") or default_cat
+        for r in db.get("links", ())
+        if isinstance(r, dict)
+    )
 
 
 def _categories(db: Dict[str, Any], hide_default: bool) -> List[str]:
-    cats = set()
     default_cat = (db.get("prefs", {}).get("default_category") or FALLBACK_CATEGORY).strip() or FALLBACK_CATEGORY
 
+    if "_index_cats" in db:
+        if hide_default:
+            return [c for c in db["_index_cats"] if c != default_cat]
+        return list(db["_index_cats"])
+
+    cats = set()
     for r in db.get("links", []):
         if isinstance(r, dict):
             c = _normalize_category_name(r.get("category") or "") or default_cat
@@ -219,37 +555,40 @@ def _categories(db: Dict[str, Any], hide_default: bool) -> List[str]:
     if isinstance(db.get("categories"), dict):
         cats.update(db["categories"].keys())
 
-    out = sorted(cats, key=lambda x: x.lower())
+    out = sorted(cats, key=str.casefold)
     if hide_default and default_cat in out:
         out.remove(default_cat)
     return out
 
 
+# Gedeelde, onveranderlijke defaults per mode: zonder overrides in settings.json
+# geeft _get_useful_links_config deze objecten terug i.p.v. per request nieuwe dicts.
+_MODE_DEFAULTS: Dict[str, Mapping[str, Any]] = {
+    "comfortable": MappingProxyType({
+        "min_width": 280,
+        "gap": 14,
+        "card_padding_y": 10,
+        "card_padding_x": 12,
+        "breakpoints": ((1400, 4), (1600, 5), (1900, 6)),
+        "max_columns": 6,
+    }),
+    "compact": MappingProxyType({
+        "min_width": 240,
+        "gap": 10,
+        "card_padding_y": 8,
+        "card_padding_x": 10,
+        "breakpoints": ((1400, 5), (1600, 6), (1900, 7)),
+        "max_columns": 7,
+    }),
+}
+
+
 def _get_useful_links_config(settings: Dict[str, Any]) -> Dict[str, Any]:
     """
     Per-tool config uit settings.json (root of modules.useful_links).
     """
     cfg = cynit_theme.get_module_cfg(settings, "useful_links")
 
-    def _mode_defaults(name: str) -> Dict[str, Any]:
-        if name == "compact":
-            return {
-                "min_width": 240,
-                "gap": 10,
-                "card_padding_y": 8,
-                "card_padding_x": 10,
-                "breakpoints": [(1400, 5), (1600, 6), (1900, 7)],
-                "max_columns": 7,
-            }
-        return {
-            "min_width": 280,
-            "gap": 14,
-            "card_padding_y": 10,
-            "card_padding_x": 12,
-            "breakpoints": [(1400, 4), (1600, 5), (1900, 6)],
-            "max_columns": 6,
-        }
-
     out: Dict[str, Any] = {"default_mode": "comfortable", "modes": {}}
     if isinstance(cfg.get("default_mode"), str) and cfg["default_mode"].strip().lower() in ("comfortable", "compact"):
         out["default_mode"] = cfg["default_mode"].strip().lower()
@@ -257,7 +596,10 @@ def _get_useful_links_config(settings: Dict[str, Any]) -> Dict[str, Any]:
     modes = cfg.get("modes") if isinstance(cfg.get("modes"), dict) else {}
     for mode_name in ("comfortable", "compact"):
         m = modes.get(mode_name, {}) if isinstance(modes.get(mode_name), dict) else {}
-        d = _mode_defaults(mode_name)
+        d = _MODE_DEFAULTS[mode_name]
+        if not m:
+            out["modes"][mode_name] = d
+            continue
 
         min_width = int(m.get("min_width", d["min_width"]))
         gap = int(m.get("gap", d["gap"]))
@@ -267,28 +609,71 @@ def _get_useful_links_config(settings: Dict[str, Any]) -> Dict[str, Any]:
 
         bp_raw = m.get("breakpoints", d["breakpoints"])
         bps: List[Tuple[int, int]] = []
-        if isinstance(bp_raw, list):
+        if isinstance(bp_raw, (list, tuple)):
             for item in bp_raw:
                 if isinstance(item, (list, tuple)) and len(item) == 2:
                     try:
                         bps.append((int(item[0]), int(item[1])))
                     except Exception:
                         pass
-        if not bps:
-            bps = list(d["breakpoints"])
 
-        out["modes"][mode_name] = {
+        mode = {
             "min_width": max(180, min_width),
             "gap": max(6, gap),
             "card_padding_y": max(6, pad_y),
             "card_padding_x": max(8, pad_x),
-            "breakpoints": bps,
+            "breakpoints": tuple(bps) or d["breakpoints"],
             "max_columns": max(1, min(12, max_cols)),
         }
+        # overrides die op de defaults uitkomen -> gedeeld object hergebruiken
+        out["modes"][mode_name] = d if mode == d else mode
 
     return out
 
 
+# Eén linkkaart; apart gecompileerd zodat de HTML per kaart gecachet kan worden.
+CARD_TEMPLATE = r"""
+            <div class="card"
+                 data-link-card="1"
+                 data-id="{{ r.id }}"
+                 data-name="{{ r.name }}"
+                 data-url="{{ r.url }}"
+                 data-category="{{ r.category }}"
+                 data-info="{{ r.info or '' }}"
+                 style="border-left: 6px solid {{ cc }}; --catcolor: {{ cc }};">
+              <div class="card-title">
+                <div class="card-name">{{ r.name }}</div>
+
+                <div class="actions">
+                  <button type="button" class="iconbtn" title="Bewerk" data-edit-btn="1">✏️</button>
+                  <button type="button" class="iconbtn" title="Copy" data-copy-btn="1" data-copy="{{ r.url }}">✔️</button>
+
+                  <form method="post" action="/links/delete/{{ r.id }}"
+                        style="display:inline-block; margin:0;"
+                        onsubmit="return confirm('Verwijderen?');">
+                    <input type="hidden" name="cat" value="{{ active_cat }}">
+                    <button type="submit" class="iconbtn" title="Verwijder">🗑️</button>
+                  </form>
+                </div>
+              </div>
+
+              <div class="hint">Categorie: <strong>{{ r.category }}</strong></div>
+
+              <div style="margin-top:6px;">
+                <a class="url" href="{{ r.url }}" target="_blank" rel="noopener noreferrer">
+                  {{ r.url }}
+                </a>
+              </div>
+
+              {% if r.info %}
+                <div class="meta">{{ r.info }}</div>
+              {% else %}
+                <div class="meta muted">&nbsp;</div>
+              {% endif %}
+            </div>
+"""
+
+
 TEMPLATE = r"""
 <!doctype html>
 <html lang="nl">
@@ -296,10 +681,8 @@ TEMPLATE = r"""
   <meta charset="utf-8">
   <title>Nuttige links - CyNiT Tools</title>
   <link rel="icon" type="image/x-icon" href="/favicon.ico">
-  <style>
-    {{ base_css|safe }}
-    {{ extra_css|safe }}
-  </style>
+  <link rel="stylesheet" href="/links/css/{{ css_hash }}.css">
+  <link rel="stylesheet" href="/links/static/useful_links.css?v={{ static_css_version }}">
 </head>
 
 <body class="mode-{{ view_mode|e }}">
@@ -348,7 +731,7 @@ TEMPLATE = r"""
         <a
           class="catblock {% if c == active_cat %}active{% endif %}"
           href="/links?cat={{ c|urlencode }}#links"
-          style="border-left: 6px solid {{ cat_colors.get(c, colors.button_fg) }};"
+          style="border-left: 6px solid {{ cat_colors[c] }};"
         >
           <div class="catname">{{ c }}</div>
           <div class="catcount">{{ counts.get(c, 0) }} link(s)</div>
@@ -369,47 +752,7 @@ TEMPLATE = r"""
     <div id="panel-links">
       {% if filtered %}
         <div class="grid">
-          {% for r in filtered %}
-            {% set cc = cat_colors.get(r.category, colors.button_fg) %}
-            <div class="card"
-                 data-link-card="1"
-                 data-id="{{ r.id|e }}"
-                 data-name="{{ r.name|e }}"
-                 data-url="{{ r.url|e }}"
-                 data-category="{{ r.category|e }}"
-                 data-info="{{ (r.info or '')|e }}"
-                 style="border-left: 6px solid {{ cc }}; --catcolor: {{ cc }};">
-              <div class="card-title">
-                <div class="card-name">{{ r.name }}</div>
-
-                <div class="actions">
-                  <button type="button" class="iconbtn" title="Bewerk" data-edit-btn="1">✏️</button>
-                  <button type="button" class="iconbtn" title="Copy" data-copy-btn="1" data-copy="{{ r.url|e }}">✔️</button>
-
-                  <form method="post" action="/links/delete/{{ r.id }}"
-                        style="display:inline-block; margin:0;"
-                        onsubmit="return confirm('Verwijderen?');">
-                    <input type="hidden" name="cat" value="{{ active_cat }}">
-                    <button type="submit" class="iconbtn" title="Verwijder">🗑️</button>
-                  </form>
-                </div>
-              </div>
-
-              <div class="hint">Categorie: <strong>{{ r.category }}</strong></div>
-
-              <div style="margin-top:6px;">
-                <a class="url" href="{{ r.url }}" target="_blank" rel="noopener noreferrer">
-                  {{ r.url }}
-                </a>
-              </div>
-
-              {% if r.info %}
-                <div class="meta">{{ r.info }}</div>
-              {% else %}
-                <div class="meta muted">&nbsp;</div>
-              {% endif %}
-            </div>
-          {% endfor %}
+          {{ cards_html }}
         </div>
       {% else %}
         <p>Geen links in deze categorie.</p>
@@ -526,9 +869,9 @@ TEMPLATE = r"""
         {% for c in all_categories %}
           <div class="catrow"
                data-cat="{{ c|e }}"
-               data-color="{{ cat_colors.get(c, colors.button_fg)|e }}"
+               data-color="{{ cat_colors[c]|e }}"
                data-isdefault="{{ '1' if c == prefs.default_category else '0' }}">
-            <div class="swatch" style="background: {{ cat_colors.get(c, colors.button_fg) }};"></div>
+            <div class="swatch" style="background: {{ cat_colors[c] }};"></div>
 
             <div class="catlabel" data-catlabel="1" title="Dubbelklik om te hernoemen">
               <strong>{{ c }}</strong>
@@ -539,7 +882,7 @@ TEMPLATE = r"""
 
             <form method="post" action="/links/category/color" style="display:flex; gap:8px; align-items:center;">
               <input type="hidden" name="category" value="{{ c }}">
-              <input type="color" name="color" value="{{ cat_colors.get(c, colors.button_fg) }}" title="Kleur">
+              <input type="color" name="color" value="{{ cat_colors[c] }}" title="Kleur">
               <button type="submit" class="iconbtn" title="Kleur opslaan">💾</button>
             </form>
 
@@ -589,7 +932,7 @@ TEMPLATE = r"""
 
           <div class="modalactions">
             <button type="submit">💾 Opslaan</button>
-            <button type="button" data-close-edit="1">Annuleren</button>
+            <button type="button" class="js-modal-close" data-target="edit">Annuleren</button>
           </div>
         </form>
       </div>
@@ -639,7 +982,7 @@ TEMPLATE = r"""
 
           <div class="modalactions">
             <button type="submit">✅ Hernoem</button>
-            <button type="button" data-close-rename="1">Annuleren</button>
+            <button type="button" class="js-modal-close" data-target="rename">Annuleren</button>
           </div>
         </form>
       </div>
@@ -745,6 +1088,11 @@ TEMPLATE = r"""
       setTimeout(() => document.getElementById('rename_new').focus(), 0);
     }
 
+    function openRenameFromRow(row) {
+      if (!row) return;
+      openRename(row.dataset.cat || '', row.dataset.color || '#00f700', (row.dataset.isdefault || '0') === '1');
+    }
+
     function closeRename() {
       const m = document.getElementById('rename_modal');
       if (m) m.style.display = 'none';
@@ -767,13 +1115,13 @@ TEMPLATE = r"""
       }
 
       if ((ev.ctrlKey || ev.metaKey) && ev.key === 'Enter') {
-        if (editOpen) { const f = editModal.querySelector('form'); if (f) { ev.preventDefault(); f.requestSubmit ? f.requestSubmit() : f.submit(); } return; }
-        if (renameOpen) { const f = renameModal.querySelector('form'); if (f) { ev.preventDefault(); f.requestSubmit ? f.requestSubmit() : f.submit(); } return; }
+        if (editOpen) { const f = editModal.getElementsByTagName('form')[0]; if (f) { ev.preventDefault(); f.requestSubmit ? f.requestSubmit() : f.submit(); } return; }
+        if (renameOpen) { const f = renameModal.getElementsByTagName('form')[0]; if (f) { ev.preventDefault(); f.requestSubmit ? f.requestSubmit() : f.submit(); } return; }
       }
 
       if ((ev.ctrlKey || ev.metaKey) && (ev.key === 's' || ev.key === 'S')) {
-        if (editOpen) { const f = editModal.querySelector('form'); if (f) { ev.preventDefault(); f.requestSubmit ? f.requestSubmit() : f.submit(); } return; }
-        if (renameOpen) { const f = renameModal.querySelector('form'); if (f) { ev.preventDefault(); f.requestSubmit ? f.requestSubmit() : f.submit(); } return; }
+        if (editOpen) { const f = editModal.getElementsByTagName('form')[0]; if (f) { ev.preventDefault(); f.requestSubmit ? f.requestSubmit() : f.submit(); } return; }
+        if (renameOpen) { const f = renameModal.getElementsByTagName('form')[0]; if (f) { ev.preventDefault(); f.requestSubmit ? f.requestSubmit() : f.submit(); } return; }
       }
 
       if (ev.key === 'Enter' && anyOpen) {
@@ -781,8 +1129,8 @@ TEMPLATE = r"""
         if (tag !== 'button') { ev.preventDefault(); return; }
       }
 
-      if (editOpen) trapTab(editModal.querySelector('.modalbox'), ev);
-      else if (renameOpen) trapTab(renameModal.querySelector('.modalbox'), ev);
+      if (editOpen) trapTab(editModal.getElementsByClassName('modalbox')[0], ev);
+      else if (renameOpen) trapTab(renameModal.getElementsByClassName('modalbox')[0], ev);
     }
 
     function bindModalOverlayClose(modalId) {
@@ -798,36 +1146,34 @@ TEMPLATE = r"""
       if ((location.hash || '').toLowerCase().includes('manage')) setTab('manage');
       else setTab('links');
 
-      document.querySelectorAll('[data-link-card="1"]').forEach(card => {
-        card.addEventListener('dblclick', (ev) => {
-          const t = ev.target;
-          if (t.closest('a') || t.closest('button') || t.closest('form')) return;
-          openEditFromCard(card);
-        });
-
-        const editBtn = card.querySelector('[data-edit-btn="1"]');
-        if (editBtn) editBtn.addEventListener('click', (ev) => { ev.preventDefault(); ev.stopPropagation(); openEditFromCard(card); });
-
-        const copyBtn = card.querySelector('[data-copy-btn="1"]');
-        if (copyBtn) copyBtn.addEventListener('click', async (ev) => {
-          ev.preventDefault(); ev.stopPropagation();
-          await copyText(copyBtn.dataset.copy || card.dataset.url || '');
-        });
-      });
+      // Gedelegeerd: één click- en één dblclick-listener voor alle kaarten,
+      // categorierijen en modal-knoppen (i.p.v. listeners per element).
+      document.addEventListener('click', async (ev) => {
+        const t = ev.target.closest('.js-modal-close, [data-edit-btn="1"], [data-copy-btn="1"], [data-rename-btn="1"]');
+        if (!t) return;
+        if (t.classList.contains('js-modal-close')) {
+          if (t.dataset.target === 'rename') closeRename(); else closeEdit();
+          return;
+        }
 
-      document.querySelectorAll('[data-close-edit="1"]').forEach(btn => btn.addEventListener('click', closeEdit));
-      document.querySelectorAll('[data-close-rename="1"]').forEach(btn => btn.addEventListener('click', closeRename));
+        ev.preventDefault(); ev.stopPropagation();
+        if (t.dataset.renameBtn === '1') { openRenameFromRow(t.closest('.catrow')); return; }
 
-      document.querySelectorAll('.catrow').forEach(row => {
-        const cat = row.dataset.cat || '';
-        const color = row.dataset.color || '#00f700';
-        const isDefault = (row.dataset.isdefault || '0') === '1';
+        const card = t.closest('[data-link-card="1"]');
+        if (!card) return;
+        if (t.dataset.editBtn === '1') openEditFromCard(card);
+        else await copyText(t.dataset.copy || card.dataset.url || '');
+      });
 
-        const label = row.querySelector('[data-catlabel="1"]');
-        if (label) label.addEventListener('dblclick', (ev) => { ev.preventDefault(); ev.stopPropagation(); openRename(cat, color, isDefault); });
+      document.addEventListener('dblclick', (ev) => {
+        const t = ev.target;
+        const label = t.closest('[data-catlabel="1"]');
+        if (label) { ev.preventDefault(); ev.stopPropagation(); openRenameFromRow(label.closest('.catrow')); return; }
 
-        const pencil = row.querySelector('[data-rename-btn="1"]');
-        if (pencil) pencil.addEventListener('click', (ev) => { ev.preventDefault(); ev.stopPropagation(); openRename(cat, color, isDefault); });
+        const card = t.closest('[data-link-card="1"]');
+        if (!card) return;
+        if (t.closest('a, button, form')) return;
+        openEditFromCard(card);
       });
 
       const rn = document.getElementById('rename_new');
@@ -855,41 +1201,70 @@ TEMPLATE = r"""
 </html>
 """
 
+# autoescape=True = zelfde gedrag als Flask voor string-templates.
+_TEMPLATE_ENV = Environment(autoescape=True)
 
-def register_web_routes(app: Flask, settings: Dict[str, Any], tools=None) -> None:
+
+@lru_cache(maxsize=1)
+def _get_template() -> Template:
     """
-    settings wordt als fallback meegegeven, maar we lezen per request settings.json live,
-    zodat je grid/tint/lettertypes meteen effect hebben zonder restart.
+    TEMPLATE één keer compileren (bij eerste gebruik / warm-up) i.p.v.
+    lex/parse/codegen per request via render_template_string.
     """
-    fallback_settings = settings if isinstance(settings, dict) else {}
+    return _TEMPLATE_ENV.from_string(TEMPLATE)
 
-    def _get_cat_colors(db: Dict[str, Any], colors: Dict[str, Any]) -> Dict[str, str]:
-        out: Dict[str, str] = {}
-        if isinstance(db.get("categories"), dict):
-            for k, v in db["categories"].items():
-                if isinstance(v, dict):
-                    out[k] = (v.get("color") or colors["button_fg"]).strip() or colors["button_fg"]
-        return out
 
-    def _css_for_mode(tool_cfg: Dict[str, Any], mode_name: str) -> str:
-        mode = tool_cfg["modes"].get(mode_name) or tool_cfg["modes"]["comfortable"]
-        minw = int(mode["min_width"])
-        gap = int(mode["gap"])
-        pad_y = int(mode["card_padding_y"])
-        pad_x = int(mode["card_padding_x"])
-        bps: List[Tuple[int, int]] = mode["breakpoints"]
-        max_cols = int(mode.get("max_columns", 12))
-
-        bp_css = ""
-        for w, cols in bps:
-            cols_eff = min(int(cols), max_cols)
-            bp_css += f"""
-            @media (min-width: {int(w)}px) {{
+@lru_cache(maxsize=1)
+def _get_card_template() -> Template:
+    return _TEMPLATE_ENV.from_string(CARD_TEMPLATE)
+
+
+def _card_html(r: Dict[str, Any], cat_color: str, active_cat: str) -> str:
+    """
+    HTML van één kaart, gecachet per (id, updated, kleur, actieve tab).
+    save_db en elke herlaadbeurt in _load_db_cached legen de cache.
+    """
+    key = (r["id"], r.get("updated", ""), cat_color, active_cat)
+    with _PAGE_CACHE_LOCK:
+        html = _CARD_HTML_CACHE.get(key)
+    if html is not None:
+        return html
+
+    html = _get_card_template().render(r=r, cc=cat_color, active_cat=active_cat)
+    with _PAGE_CACHE_LOCK:
+        if len(_CARD_HTML_CACHE) >= _CARD_HTML_CACHE_MAX:
+            _CARD_HTML_CACHE.pop(next(iter(_CARD_HTML_CACHE)))
+        _CARD_HTML_CACHE[key] = html
+    return html
+
+
+def _mode_key(tool_cfg: Dict[str, Any], mode_name: str) -> Tuple[Any, ...]:
+    """Hashbare sleutel met alleen de mode-waarden die in de CSS terechtkomen."""
+    mode = tool_cfg["modes"].get(mode_name) or tool_cfg["modes"]["comfortable"]
+    return (
+        int(mode["min_width"]),
+        int(mode["gap"]),
+        int(mode["card_padding_y"]),
+        int(mode["card_padding_x"]),
+        tuple((int(w), int(cols)) for w, cols in mode["breakpoints"]),
+        int(mode.get("max_columns", 12)),
+    )
+
+
+@lru_cache(maxsize=16)
+def _css_for_mode_cached(mode_name: str, key: Tuple[Any, ...]) -> str:
+    minw, gap, pad_y, pad_x, bps, max_cols = key
+
+    bp_css = ""
+    for w, cols in bps:
+        cols_eff = min(cols, max_cols)
+        bp_css += f"""
+            @media (min-width: {w}px) {{
               body.mode-{mode_name} .grid {{ grid-template-columns: repeat({cols_eff}, 1fr); }}
             }}
             """
 
-        return f"""
+    return f"""
         body.mode-{mode_name} .grid {{
           grid-template-columns: repeat(auto-fill, minmax({minw}px, 1fr));
           gap: {gap}px;
@@ -900,15 +1275,104 @@ def register_web_routes(app: Flask, settings: Dict[str, Any], tools=None) -> Non
         {bp_css}
         """
 
+
+@lru_cache(maxsize=4)
+def _build_extra_css(
+    colors_key: Tuple[str, str, str],
+    comfortable_key: Tuple[Any, ...],
+    compact_key: Tuple[Any, ...],
+) -> str:
+    """
+    Variabel deel van de pagina-CSS: kleurvariabelen + grid per mode. De vaste
+    stijl staat in static/useful_links.css. Gecachet op precies deze waarden
+    (wijziging in settings => nieuwe sleutel).
+    """
+    background, general_fg, button_fg = colors_key
+    return f"""
+        :root {{
+          --ul-bg: {background};
+          --ul-fg: {general_fg};
+          --ul-accent: {button_fg};
+        }}
+
+        {_css_for_mode_cached("comfortable", comfortable_key)}
+        {_css_for_mode_cached("compact", compact_key)}
+        """
+
+
+def register_web_routes(app: Flask, settings: Dict[str, Any], tools=None) -> None:
+    """
+    settings wordt als fallback meegegeven, maar we lezen per request settings.json live,
+    zodat je grid/tint/lettertypes meteen effect hebben zonder restart.
+    """
+    fallback_settings = settings if isinstance(settings, dict) else {}
+    _warm_up(fallback_settings)
+
+    def _get_cat_colors(db: Dict[str, Any], colors: Dict[str, Any], cats: List[str]) -> Dict[str, str]:
+        """
+        Platte {categorie: kleur} voor alle categorieën, fallback al ingevuld,
+        zodat de template gewoon cat_colors[c] kan doen. Bewaard op de
+        (gememoiseerde) db per fallback-kleur; save_db levert een nieuwe db op.
+        """
+        fg = colors["button_fg"]
+        cached = db.get("_cat_colors")
+        if cached is not None and cached[0] == fg:
+            return cached[1]
+
+        meta = db.get("categories") if isinstance(db.get("categories"), dict) else {}
+        out: Dict[str, str] = {}
+        for c in cats:
+            v = meta.get(c)
+            color = v.get("color") if isinstance(v, dict) else None
+            out[c] = (color or fg).strip() or fg
+        db["_cat_colors"] = (fg, out)
+        return out
+
+    def _extra_css(colors: Dict[str, Any], tool_cfg: Dict[str, Any]) -> str:
+        return _build_extra_css(
+            (colors.get("background", "#000"), colors["general_fg"], colors["button_fg"]),
+            _mode_key(tool_cfg, "comfortable"),
+            _mode_key(tool_cfg, "compact"),
+        )
+
+    def _page_css(live_settings: Dict[str, Any], colors: Dict[str, Any], tool_cfg: Dict[str, Any]) -> Tuple[str, str]:
+        """
+        Volledige CSS van de pagina + content-hash (fingerprint voor de stylesheet-URL).
+        """
+        css = cynit_layout.common_css(live_settings) + "\n" + _extra_css(colors, tool_cfg)
+        css_hash = hashlib.blake2b(css.encode("utf-8"), digest_size=8).hexdigest()
+        with _PAGE_CACHE_LOCK:
+            if css_hash not in _CSS_CACHE:
+                if len(_CSS_CACHE) >= _CSS_CACHE_MAX:
+                    _CSS_CACHE.pop(next(iter(_CSS_CACHE)))
+                _CSS_CACHE[css_hash] = css
+        return css_hash, css
+
     @app.route("/links", methods=["GET"])
     def useful_links_index():
-        db = load_db()
-
-        live_settings = cynit_theme.load_settings_live(fallback_settings)
+        # geïnterneerd, net als de categorieën uit load_db: == in de filter slaagt
+        # dan meteen op identiteit i.p.v. de strings te vergelijken
+        active_cat = sys.intern((request.args.get("cat") or "__ALL__").strip() or "__ALL__")
+        error = request.args.get("error", "")
+        msg = request.args.get("msg", "")
+
+        settings_stamp = _file_stamp(SETTINGS_PATH)
+        db_version = _db_version()
+        if db_version[0] is not None:
+            cached = _page_cache_get((db_version, settings_stamp, active_cat, error, msg))
+            if cached is not None:
+                return cached
+
+        db = _load_db_cached()
+        # versie van vóór het laden: slaat load_db (of een andere request) intussen
+        # op, dan is deze sleutel meteen verouderd en wordt hij nooit meer geraakt
+        cache_key = (db_version, settings_stamp, active_cat, error, msg)
+
+        live_settings = _load_settings_cached(fallback_settings)
         colors = live_settings["colors"]
         tool_cfg = _get_useful_links_config(live_settings)
 
-        base_css = cynit_layout.common_css(live_settings)
+        css_hash, _ = _page_css(live_settings, colors, tool_cfg)
         common_js = cynit_layout.common_js()
         header = cynit_layout.header_html(live_settings, tools=tools, title="Nuttige links", right_html="")
         footer = cynit_layout.footer_html()
@@ -927,202 +1391,28 @@ def register_web_routes(app: Flask, settings: Dict[str, Any], tools=None) -> Non
         categories = _categories(db, hide_default=hide_default)
         all_categories = _categories(db, hide_default=False)
 
-        active_cat = (request.args.get("cat") or "__ALL__").strip() or "__ALL__"
-        cat_colors = _get_cat_colors(db, colors)
-
-        rows = db.get("links", [])
-        rows = sorted(rows, key=lambda r: ((r.get("category") or "").lower(), (r.get("name") or "").lower()))
+        cat_colors = _get_cat_colors(db, colors, all_categories)
 
+        # Kolommen zijn al gesorteerd (per db-versie), filteren behoudt die volgorde.
+        cols = _link_columns(db)
         if active_cat != "__ALL__":
-            filtered = [r for r in rows if (r.get("category") or "") == active_cat]
+            # één categorie: kant-en-klare (al gesorteerde) lijst, geen pass over alle links
+            filtered = cols["by_cat"].get(active_cat, [])
+        elif hide_default:
+            filtered = [r for r, c in zip(cols["rows"], cols["cats"]) if c != default_cat]
         else:
-            filtered = [r for r in rows if (r.get("category") or "") != default_cat] if hide_default else rows
-
-        extra_css = f"""
-        .topbar {{
-          display:flex; align-items:center; justify-content:space-between; gap:10px;
-          margin: 8px 0 14px 0;
-        }}
-
-        .sticky-tabs {{
-          position: sticky;
-          top: 0;
-          z-index: 50;
-          padding: 8px 0;
-          background: {colors.get("background", "#000")};
-          border-bottom: 1px solid #222;
-        }}
-
-        .tabs {{ display:flex; gap:8px; }}
-        .tabbtn {{
-          border: 1px solid #333;
-          background: #111;
-          border-radius: 0;
-          padding: 6px 12px;
-          cursor: pointer;
-          color: {colors["general_fg"]};
-        }}
-        .tabbtn.active {{
-          background: {colors["button_fg"]};
-          color: #000;
-          border-color: {colors["button_fg"]};
-          font-weight: 800;
-        }}
-
-        .viewtoggle {{ display:flex; gap:8px; align-items:center; }}
-        .pill {{
-          border: 1px solid #333; background:#111; color:{colors["general_fg"]};
-          border-radius: 0; padding: 6px 10px; cursor:pointer;
-        }}
-        .pill:hover {{ background:#222; }}
-        .pill.active {{
-          background: {colors["button_fg"]};
-          color: #000;
-          border-color: {colors["button_fg"]};
-          font-weight: 800;
-        }}
-
-        .catbar {{ display:flex; flex-wrap:wrap; gap:10px; margin:10px 0 16px 0; }}
-        .catblock {{
-          display:flex; flex-direction:column; justify-content:center; gap:2px;
-          width: 160px; min-height: 58px; padding: 10px 12px;
-          border: 1px solid #2a2a2a; border-radius: 0; background: #0b0b0b;
-          text-decoration:none; color: {colors["general_fg"]};
-          transition: background 0.15s ease, border-color 0.15s ease, transform 0.05s ease;
-        }}
-        .catblock:hover {{ background:#101010; }}
-        .catblock:active {{ transform: translateY(1px); }}
-        .catblock.active {{ background:#111; border-color:#ffffff55; }}
-        .catname {{ font-weight: 800; line-height: 1.05; }}
-        .catcount {{ opacity: 0.85; font-size: 0.9em; }}
-
-        .grid {{
-          display: grid;
-          margin-bottom: 18px;
-        }}
-
-        .card {{
-          border: 1px solid #2a2a2a; border-radius: 0; background: #0b0b0b;
-          display:flex; flex-direction:column; height: 100%;
-          transition: background 0.15s ease, border-color 0.15s ease;
-        }}
-        .card:hover {{ background:#101010; border-color: {colors["button_fg"]}; }}
-
-        .card-title {{
-          display:flex; justify-content:space-between; align-items:center; gap:8px;
-          margin:0 0 8px 0; padding-bottom:8px; border-bottom:1px solid #222;
-        }}
-
-        /* ✅ Link-naam in categorie-kleur */
-        .card-name {{
-          font-weight: 800;
-          letter-spacing: 0.2px;
-          color: var(--catcolor, {colors["general_fg"]});
-        }}
-
-        .actions {{ display: inline-flex; gap: 6px; align-items: center; }}
-        .iconbtn {{
-          border: 1px solid #333; background: #111; border-radius: 0;
-          padding: 4px 8px; cursor: pointer; color: {colors["general_fg"]};
-        }}
-        .iconbtn:hover {{ background: #222; }}
-
-        .url {{ word-break: break-all; text-decoration: underline; color: {colors["general_fg"]}; }}
-
-        .meta {{ white-space: pre-wrap; margin-top: auto; padding-top: 10px; opacity: 0.95; }}
-        .muted {{ opacity: 0.5; }}
-
-        .row {{
-          display:grid; grid-template-columns: 160px 1fr; gap:10px;
-          align-items:center; margin: 8px 0;
-        }}
-
-        input[type="text"], textarea {{
-          width: 100%; padding: 7px 10px; border-radius: 0; border: 1px solid #333;
-          background: #0b0b0b; color: {colors["general_fg"]}; box-sizing: border-box;
-        }}
-        textarea {{ min-height: 90px; resize: vertical; }}
+            filtered = cols["rows"]
 
-        input[type="color"] {{
-          width: 54px; height: 34px; border: 1px solid #333; background: #111;
-          padding: 0; border-radius: 0; cursor: pointer;
-        }}
-
-        input[type="range"] {{
-          width: min(520px, 100%);
-        }}
-
-        .selectbox {{
-          border: 1px solid #333; background: #0b0b0b; color: {colors["general_fg"]};
-          border-radius: 0; padding: 6px 10px; min-width: 240px;
-        }}
-
-        .hint {{ opacity: 0.85; font-size: 0.9em; }}
-        .err {{ color: #ff4d4d; font-weight: bold; margin: 8px 0 10px 0; }}
-        .ok {{ color: #88ff88; font-weight: bold; margin: 8px 0 10px 0; }}
-
-        .sep {{ margin: 18px 0; border: 0; border-top: 1px solid #222; }}
-
-        .prefsbar {{ border: 1px solid #222; background: #0b0b0b; padding: 10px 12px; border-radius: 0; }}
-        .smallbtn {{
-          border: 1px solid #333; background: #111; border-radius: 0;
-          padding: 6px 10px; cursor: pointer; color: {colors["general_fg"]};
-        }}
-        .smallbtn:hover {{ background: #222; }}
-
-        .gridrow {{
-          display:grid; grid-template-columns: 160px 1fr; gap: 10px; align-items:center;
-          padding: 8px 0; border-top: 1px solid #1b1b1b;
-        }}
-        .gridrow:first-child {{ border-top: 0; }}
-        .gridlabel {{ opacity: 0.95; }}
-        .gridcontrol {{ display:flex; align-items:center; gap: 12px; flex-wrap: wrap; }}
-        .gridvalue {{ opacity: 0.9; min-width: 160px; }}
-
-        .catrow {{
-          display:flex; gap:10px; align-items:center; margin:6px 0;
-          border: 1px solid #222; background:#0b0b0b; padding: 8px 10px; border-radius: 0;
-        }}
-        .swatch {{ width:14px; height:14px; border-radius:0; border: 1px solid #222; }}
-
-        .catlabel {{
-          min-width: 260px; display:flex; gap:10px; align-items:center;
-          cursor: default; user-select: none;
-        }}
-        .catlabel:hover {{ outline: 1px dashed #333; outline-offset: 3px; }}
-
-        .badge {{
-          display:inline-block; padding: 2px 6px; border: 1px solid #333;
-          background: #111; border-radius: 0; font-size: 0.75em; opacity: 0.9;
-        }}
-
-        .modal {{
-          position:fixed; inset:0; background: rgba(0,0,0,0.75);
-          display:flex; align-items:flex-start; justify-content:center;
-          padding: 6vh 12px; z-index: 9999;
-        }}
-        .modalbox {{
-          width: min(880px, 100%); background:#0b0b0b; border:1px solid #333;
-          border-radius:0; padding: 14px 16px;
-        }}
-        .modalactions {{ margin-top: 12px; display:flex; gap:10px; }}
-
-        .rename-preview {{ display:flex; gap:12px; align-items:stretch; border:1px solid #222; background:#0b0b0b; }}
-        .rename-preview-bar {{ width: 10px; background: {colors["button_fg"]}; }}
-        .rename-preview-text {{ padding: 10px 12px; flex: 1; }}
-        .rename-preview-title {{ font-weight: 800; display:flex; gap:10px; align-items:center; }}
-
-        {_css_for_mode(tool_cfg, "comfortable")}
-        {_css_for_mode(tool_cfg, "compact")}
-        """
+        cards_html = Markup("".join(
+            _card_html(r, cat_colors[r["category"]], active_cat) for r in filtered
+        ))
 
         max_cols_comfortable = int(tool_cfg["modes"]["comfortable"].get("max_columns", 6))
         max_cols_compact = int(tool_cfg["modes"]["compact"].get("max_columns", 7))
 
-        return render_template_string(
-            TEMPLATE,
-            base_css=base_css,
-            extra_css=extra_css,
+        stream = _get_template().stream(
+            css_hash=css_hash,
+            static_css_version=_STATIC_CSS_VERSION,
             common_js=common_js,
             header=header,
             footer=footer,
@@ -1133,14 +1423,48 @@ def register_web_routes(app: Flask, settings: Dict[str, Any], tools=None) -> Non
             total=total,
             active_cat=active_cat,
             filtered=filtered,
+            cards_html=cards_html,
             cat_colors=cat_colors,
             prefs={"default_category": default_cat, "hide_default_category": hide_default},
             view_mode=view_mode,
             max_cols_comfortable=max_cols_comfortable,
             max_cols_compact=max_cols_compact,
-            error=request.args.get("error", ""),
-            msg=request.args.get("msg", ""),
+            error=error,
+            msg=msg,
         )
+        # kleine Jinja-events bundelen tot grotere chunks voor de socket
+        stream.enable_buffering(_STREAM_BUFFER)
+
+        def generate():
+            # streamen (eerste bytes meteen weg) en tegelijk opvangen voor de page-cache
+            parts: List[str] = []
+            for chunk in stream:
+                parts.append(chunk)
+                yield chunk
+            if cache_key[0][0] is not None:
+                _page_cache_put(cache_key, "".join(parts))
+
+        return Response(stream_with_context(generate()), mimetype="text/html")
+
+    @app.route("/links/static/useful_links.css", methods=["GET"])
+    def useful_links_static_css():
+        # URL bevat ?v=<mtime>, dus lang cachen is veilig
+        return send_from_directory(_STATIC_DIR, "useful_links.css", max_age=31536000)
+
+    @app.route("/links/css/<css_hash>.css", methods=["GET"])
+    def useful_links_css(css_hash: str):
+        css = _CSS_CACHE.get(css_hash)
+        current_hash = css_hash
+        if css is None:
+            # onbekende fingerprint (bv. na herstart): huidige CSS, maar niet lang cachen
+            live_settings = _load_settings_cached(fallback_settings)
+            current_hash, css = _page_css(live_settings, live_settings["colors"], _get_useful_links_config(live_settings))
+        immutable = current_hash == css_hash
+
+        resp = Response(css, mimetype="text/css")
+        resp.set_etag(current_hash)
+        resp.headers["Cache-Control"] = "public, max-age=31536000, immutable" if immutable else "no-cache"
+        return resp.make_conditional(request)
 
     # ---- LINKS CRUD ----
     @app.route("/links/add", methods=["POST"])
@@ -1159,10 +1483,7 @@ def register_web_routes(app: Flask, settings: Dict[str, Any], tools=None) -> Non
         if not category:
             category = default_cat
 
-        db["categories"].setdefault(category, {"color": DEFAULT_COLOR})
-        if not isinstance(db["categories"][category], dict):
-            db["categories"][category] = {"color": DEFAULT_COLOR}
-        db["categories"][category].setdefault("color", DEFAULT_COLOR)
+        _ensure_category(db, category)
 
         db["links"].append(
             {"id": str(uuid.uuid4()), "name": name, "url": url, "category": category, "info": info,
@@ -1188,10 +1509,7 @@ def register_web_routes(app: Flask, settings: Dict[str, Any], tools=None) -> Non
         if not category:
             category = default_cat
 
-        db["categories"].setdefault(category, {"color": DEFAULT_COLOR})
-        if not isinstance(db["categories"][category], dict):
-            db["categories"][category] = {"color": DEFAULT_COLOR}
-        db["categories"][category].setdefault("color", DEFAULT_COLOR)
+        _ensure_category(db, category)
 
         found = False
         for r in db.get("links", []):
@@ -1241,11 +1559,7 @@ def register_web_routes(app: Flask, settings: Dict[str, Any], tools=None) -> Non
                 return redirect(url_for("useful_links_index", cat="__ALL__", error="Default category is verplicht.") + "#manage")
 
             db["prefs"]["default_category"] = new_default
-            db.setdefault("categories", {})
-            db["categories"].setdefault(new_default, {"color": DEFAULT_COLOR})
-            if not isinstance(db["categories"][new_default], dict):
-                db["categories"][new_default] = {"color": DEFAULT_COLOR}
-            db["categories"][new_default].setdefault("color", DEFAULT_COLOR)
+            _ensure_category(db, new_default)
 
             save_db(db)
             return redirect(url_for("useful_links_index", cat="__ALL__", msg="Default category opgeslagen!") + "#manage")
@@ -1308,10 +1622,7 @@ def register_web_routes(app: Flask, settings: Dict[str, Any], tools=None) -> Non
         if not color.startswith("#") or len(color) != 7:
             return redirect(url_for("useful_links_index", cat="__ALL__", error="Kleur ongeldig.") + "#manage")
 
-        db["categories"].setdefault(cat, {"color": DEFAULT_COLOR})
-        if not isinstance(db["categories"][cat], dict):
-            db["categories"][cat] = {"color": DEFAULT_COLOR}
-        db["categories"][cat]["color"] = color
+        _ensure_category(db, cat)["color"] = color
         save_db(db)
         return redirect(url_for("useful_links_index", cat=cat, msg="Kleur opgeslagen!") + "#manage")
 
@@ -1332,25 +1643,16 @@ def register_web_routes(app: Flask, settings: Dict[str, Any], tools=None) -> Non
         if color and (not color.startswith("#") or len(color) != 7):
             return redirect(url_for("useful_links_index", cat="__ALL__", error="Kleur ongeldig.") + "#manage")
 
-        db.setdefault("categories", {})
-        if not isinstance(db["categories"], dict):
-            db["categories"] = {}
-
-        old_meta = db["categories"].get(old_cat, {"color": DEFAULT_COLOR})
-        if not isinstance(old_meta, dict):
-            old_meta = {"color": DEFAULT_COLOR}
-
-        db["categories"].setdefault(new_cat, {})
-        if not isinstance(db["categories"][new_cat], dict):
-            db["categories"][new_cat] = {}
-        db["categories"][new_cat].setdefault("color", old_meta.get("color") or DEFAULT_COLOR)
+        old_meta = db["categories"].get(old_cat)
+        old_color = (old_meta.get("color") if isinstance(old_meta, dict) else None) or DEFAULT_COLOR
 
+        new_meta = _ensure_category(db, new_cat, old_color)
         if color:
-            db["categories"][new_cat]["color"] = color
+            new_meta["color"] = color
 
         if move_links:
             for r in db.get("links", []):
-                if isinstance(r, dict) and (r.get("category") or "") == old_cat:
+                if r["category"] == old_cat:
                     r["category"] = new_cat
                     r["updated"] = _now_iso()
 
@@ -1359,17 +1661,12 @@ def register_web_routes(app: Flask, settings: Dict[str, Any], tools=None) -> Non
 
         if old_cat != new_cat:
             still_in_use = any(
-                isinstance(r, dict) and (r.get("category") or "") == old_cat
-                for r in db.get("links", [])
+                r["category"] == old_cat for r in db.get("links", [])
             )
             if not still_in_use:
                 db["categories"].pop(old_cat, None)
 
-        default_cat = db["prefs"]["default_category"]
-        db["categories"].setdefault(default_cat, {"color": DEFAULT_COLOR})
-        if not isinstance(db["categories"][default_cat], dict):
-            db["categories"][default_cat] = {"color": DEFAULT_COLOR}
-        db["categories"][default_cat].setdefault("color", DEFAULT_COLOR)
+        _ensure_category(db, db["prefs"]["default_category"])
 
         save_db(db)
         return redirect(url_for("useful_links_index", cat="__ALL__", msg="Categorie hernoemd!") + "#manage")
@@ -1382,7 +1679,7 @@ def register_web_routes(app: Flask, settings: Dict[str, Any], tools=None) -> Non
         if not cat:
             return redirect(url_for("useful_links_index", cat="__ALL__", error="Geen categorie meegegeven.") + "#manage")
 
-        in_use = any(isinstance(r, dict) and (r.get("category") or "") == cat for r in db.get("links", []))
+        in_use = any(r["category"] == cat for r in db.get("links", []))
         if in_use:
             return redirect(url_for("useful_links_index", cat=cat, error="Categorie heeft nog links. Verplaats die eerst.") + "#manage")
 
@@ -1394,3 +1691,27 @@ def register_web_routes(app: Flask, settings: Dict[str, Any], tools=None) -> Non
             save_db(db)
 
         return redirect(url_for("useful_links_index", cat="__ALL__", msg="Categorie verwijderd!") + "#manage")
+
+
+def _warm_up(fallback: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Caches vullen zodat de eerste request niet de koude start betaalt: templates
+    bij import, settings + mode-CSS bij register_web_routes (met de fallback die
+    de routes zelf meegeven). De db blijft erbuiten: load_db maakt
+    useful_links.json aan als die ontbreekt. Uitschakelen met CYNIT_NO_WARM=1.
+    """
+    if os.environ.get("CYNIT_NO_WARM"):
+        return
+    # best effort: import/registratie mag hier nooit op breken
+    try:
+        _get_template()
+        _get_card_template()
+        if fallback is not None:
+            tool_cfg = _get_useful_links_config(_load_settings_cached(fallback))
+            mode = tool_cfg["default_mode"]
+            _css_for_mode_cached(mode, _mode_key(tool_cfg, mode))
+    except Exception:
+        logger.warning("[USEFUL_LINKS] warm-up failed", exc_info=True)
+
+
+_warm_up()
@@ -17,17 +17,32 @@ Features:
 from __future__ import annotations
 
 import os
+import atexit
+import re
 import sys
 import string
+import hashlib
+import importlib.util
 import secrets
+import shutil
 import logging
+import queue
+import threading
 import traceback
+import zipfile
 import subprocess
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Any, Tuple
 
-from flask import Flask, request, render_template_string
+from flask import Flask, Response, request, send_file, stream_with_context
+from jinja2 import Environment, Template
 
 import cynit_theme
 import cynit_layout
@@ -62,18 +77,31 @@ ROOT_BASE_DIR = r"C:\Users\lemmenmf\OneDrive - Vlaamse overheid - Office 365\DCB
 
 PASS_LENGTH = 24
 KEY_SIZE_DEFAULT = 2048
+# "rsa" (key_size geldt) of "ec_p256" (ECDSA P-256: veel snellere keygen)
+KEY_ALGS = ("rsa", "ec_p256")
+KEY_ALG_DEFAULT = "rsa"
 
 OPENSSL_BIN = "openssl"
 OPENSSL_CONF: Optional[str] = None
+# certs scannen via 'openssl x509' i.p.v. in-process (enkel relevant voor de OpenSSL engine)
+USE_OPENSSL_PARSE = False
+# .p12 via 'openssl pkcs12' i.p.v. in-process (enkel relevant voor de OpenSSL engine)
+USE_OPENSSL_PKCS12 = False
+# max. parallelle key/CSR-generaties (None = aantal CPU's)
+MAX_PARALLEL_KEYGEN: Optional[int] = None
 
 CERT_EXTS = (".cer", ".crt", ".pem")
+_CERT_EXT_SET = frozenset(e.lstrip(".") for e in CERT_EXTS)
+# eigen output die ook op .pem eindigt
+_CERT_EXCLUDE_PEM = (".key.pem", ".combined.pem")
 
 # UI / state
 SETTINGS: Dict[str, Any] = {}
 TOOLS: List[Dict[str, Any]] = []
 VOICA_CFG: Dict[str, Any] = {}
 
-# default: Python engine (dan heb je geen openssl nodig)
+# default: Python engine (dan heb je geen openssl nodig); zonder
+# 'cryptography' maar met een openssl binary wordt het openssl (zie _auto_engine)
 DEFAULT_ENGINE = "python"   # "python" | "openssl"
 DEBUG_DEFAULT = False
 
@@ -83,12 +111,35 @@ class CommandError(Exception):
     pass
 
 
+@dataclass
+class CertEntry:
+    """Gevonden certificaat: één keer ingelezen bij het scannen, daarna hergebruikt."""
+    path: Path
+    cn: str
+    pem: Optional[bytes] = None
+    parsed: Optional[Any] = None
+
+
 # =========================
 # Config apply
 # =========================
 
+def _auto_engine() -> str:
+    """
+    Engine als de config er geen kiest. 'cryptography' roept zelf native
+    OpenSSL aan (ook voor de priemgeneratie) zonder subproces per stap, dus
+    die blijft de voorkeur; enkel als ze ontbreekt en openssl wel op het pad
+    staat, is openssl de snelste werkende keuze.
+    """
+    if importlib.util.find_spec("cryptography") is not None:
+        return "python"
+    if shutil.which(OPENSSL_BIN):
+        return "openssl"
+    return DEFAULT_ENGINE
+
 def apply_voica_config(voica_cfg: Dict[str, Any]) -> None:
     global VOICA_CFG, ROOT_BASE_DIR, PASS_LENGTH, KEY_SIZE_DEFAULT, OPENSSL_BIN, OPENSSL_CONF, DEFAULT_ENGINE, DEBUG_DEFAULT
+    global USE_OPENSSL_PARSE, USE_OPENSSL_PKCS12, MAX_PARALLEL_KEYGEN, KEY_ALG_DEFAULT
     VOICA_CFG = voica_cfg or {}
 
     ROOT_BASE_DIR = VOICA_CFG.get("root_base_dir", ROOT_BASE_DIR)
@@ -103,10 +154,22 @@ def apply_voica_config(voica_cfg: Dict[str, Any]) -> None:
     except Exception:
         pass
 
+    KEY_ALG_DEFAULT = (VOICA_CFG.get("default_key_alg") or KEY_ALG_DEFAULT).strip().lower()
+    if KEY_ALG_DEFAULT not in KEY_ALGS:
+        KEY_ALG_DEFAULT = "rsa"
+
     OPENSSL_BIN = VOICA_CFG.get("openssl_bin", OPENSSL_BIN)
     OPENSSL_CONF = VOICA_CFG.get("openssl_conf", OPENSSL_CONF)
+    USE_OPENSSL_PARSE = bool(VOICA_CFG.get("use_openssl_parse", USE_OPENSSL_PARSE))
+    USE_OPENSSL_PKCS12 = bool(VOICA_CFG.get("use_openssl_pkcs12", USE_OPENSSL_PKCS12))
 
-    DEFAULT_ENGINE = (VOICA_CFG.get("default_engine") or DEFAULT_ENGINE).strip().lower()
+    try:
+        n = VOICA_CFG.get("max_parallel_keygen")
+        MAX_PARALLEL_KEYGEN = max(1, int(n)) if n is not None else None
+    except Exception:
+        pass
+
+    DEFAULT_ENGINE = (VOICA_CFG.get("default_engine") or _auto_engine()).strip().lower()
     if DEFAULT_ENGINE not in ("python", "openssl"):
         DEFAULT_ENGINE = "python"
 
@@ -126,35 +189,58 @@ def set_debug_enabled(enabled: bool) -> None:
     """Zet logger level live."""
     logger.setLevel(logging.DEBUG if enabled else logging.INFO)
 
-def generate_password(length: int) -> str:
-    lower = string.ascii_lowercase
-    upper = string.ascii_uppercase
-    digits = string.digits
-    symbols = "!@#$%&*()-_=+;[{}]:,.<>?/"
+def _format_tb(e: BaseException) -> str:
+    """
+    Traceback als tekst, enkel opgebouwd als hij echt getoond wordt (debug in
+    de UI). Logging gebruikt exc_info: daar formatteert de logger pas als het
+    DEBUG-record effectief weggeschreven wordt.
+    """
+    return "".join(traceback.format_exception(type(e), e, e.__traceback__))
 
-    all_chars = lower + upper + digits + symbols
-    non_symbols = lower + upper + digits
+_PW_LOWER = string.ascii_lowercase
+_PW_UPPER = string.ascii_uppercase
+_PW_DIGITS = string.digits
+_PW_SYMBOLS = "!@#$%&*()-_=+;[{}]:,.<>?/"
+_PW_ALL = _PW_LOWER + _PW_UPPER + _PW_DIGITS + _PW_SYMBOLS
+_PW_NON_SYMBOLS = _PW_LOWER + _PW_UPPER + _PW_DIGITS
 
-    length = max(8, int(length))
+# één CSPRNG-instantie voor shuffle i.p.v. per wachtwoord een nieuwe
+_SR = secrets.SystemRandom()
 
-    while True:
-        pwd = [
-            secrets.choice(lower),
-            secrets.choice(upper),
-            secrets.choice(digits),
-            secrets.choice(symbols),
-        ]
-        pwd += [secrets.choice(all_chars) for _ in range(length - 4)]
-        secrets.SystemRandom().shuffle(pwd)
+def _random_chars(alphabet: str, count: int) -> List[str]:
+    """
+    count uniforme tekens uit alphabet, uit één urandom-buffer i.p.v. één
+    secrets.choice (= os.urandom) per teken. Rejection sampling (b < limit)
+    houdt de verdeling uniform.
+    """
+    n = len(alphabet)
+    limit = 256 - (256 % n)
+    out: List[str] = []
+    while len(out) < count:
+        buf = secrets.token_bytes((count - len(out)) * 2)
+        out.extend(alphabet[b % n] for b in buf if b < limit)
+    del out[count:]
+    return out
 
-        if pwd[0] in symbols or pwd[-1] in symbols:
-            continue
-        if not any(ch in symbols for ch in pwd[1:-1]):
-            continue
-        if pwd[0] not in non_symbols or pwd[-1] not in non_symbols:
-            continue
+def generate_password(length: int) -> str:
+    """
+    Constructief opgebouwd zodat de regels altijd kloppen (geen retry-lus):
+    eerste/laatste teken geen symbool, minstens één symbool in het midden,
+    en minstens één kleine letter, hoofdletter en cijfer.
+    """
+    length = max(8, int(length))
 
-        return "".join(pwd)
+    edges = _random_chars(_PW_NON_SYMBOLS, 2)
+    middle = (
+        _random_chars(_PW_SYMBOLS, 1)
+        + _random_chars(_PW_LOWER, 1)
+        + _random_chars(_PW_UPPER, 1)
+        + _random_chars(_PW_DIGITS, 1)
+        + _random_chars(_PW_ALL, length - 6)
+    )
+    _SR.shuffle(middle)
+
+    return edges[0] + "".join(middle) + edges[1]
 
 def validate_device_id(device_id: str) -> str:
     d = device_id.strip()
@@ -174,13 +260,23 @@ def build_devices_string(devices: List[str]) -> str:
         return devices[0]
     return "; ".join(devices[:-1]) + f" & {devices[-1]}"
 
+# (datum, root) -> pad: pad maar één keer per dag opbouwen
+_BASE_DIR_CACHE: Tuple[Any, str, str] = (None, "", "")
+
 def compute_default_base_dir() -> str:
-    root = Path(ROOT_BASE_DIR)
-    now = datetime.now()
-    target = root / f"{now.year}" / f"{now.month:02d}" / f"{now.day}"
-    target.mkdir(parents=True, exist_ok=True)
+    global _BASE_DIR_CACHE
+    today = datetime.now().date()
+    cached_day, cached_root, cached = _BASE_DIR_CACHE
+    if cached_day == today and cached_root == ROOT_BASE_DIR:
+        # map kan intussen verwijderd/verplaatst zijn (share): mkdir blijft
+        os.makedirs(cached, exist_ok=True)
+        return cached
+
+    target = os.path.join(ROOT_BASE_DIR, f"{today.year}", f"{today.month:02d}", f"{today.day}")
+    os.makedirs(target, exist_ok=True)
     logger.debug("[VOICA1] compute_default_base_dir -> %s", target)
-    return str(target)
+    _BASE_DIR_CACHE = (today, ROOT_BASE_DIR, target)
+    return target
 
 def _device_type_label(device_type: str) -> str:
     if device_type == "pc":
@@ -198,28 +294,86 @@ def write_batch_log(base_dir: Path, device_type: str, password: str, created_fil
     log_name = f"{now.month:02d}_{now.day:02d}.txt"
     log_path = base_dir / log_name
 
+    # hele blok in één keer opbouwen en wegschrijven; de bestanden zijn binnen
+    # dezelfde request aangemaakt, dus één timestamp volstaat
+    ts = now.strftime("%Y-%m-%d %H:%M:%S")
+    lines = [
+        f"PASSWORD: {password}",
+        f"TYPE: {_device_type_label(device_type)}",
+        f"START: {ts}",
+        "-" * 60,
+    ]
+    lines += [f"{ts} | CREATED | {p.name}" for p in created_files]
+
     with log_path.open("a", encoding="utf-8") as f:
-        header_ts = now.strftime("%Y-%m-%d %H:%M:%S")
-        f.write(f"PASSWORD: {password}\n")
-        f.write(f"TYPE: {_device_type_label(device_type)}\n")
-        f.write(f"START: {header_ts}\n")
-        f.write("-" * 60 + "\n")
-        for p in created_files:
-            ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            f.write(f"{ts} | CREATED | {p.name}\n")
-        f.write("\n")
+        f.write("\n".join(lines) + "\n\n")
 
     logger.debug("[VOICA1] batch log written: %s", log_path)
 
 
+
+# Batch logs via één writer-thread: de request wacht niet op de append, en
+# gelijktijdige batches worden na elkaar (niet door elkaar) weggeschreven.
+_LOG_QUEUE: queue.SimpleQueue[Optional[Tuple[Path, str, str, List[Path]]]] = queue.SimpleQueue()
+_LOG_THREAD: Optional[threading.Thread] = None
+_LOG_THREAD_LOCK = threading.Lock()
+
+
+def _batch_log_writer() -> None:
+    while True:
+        item = _LOG_QUEUE.get()
+        if item is None:
+            return
+        try:
+            write_batch_log(*item)
+        except Exception as e:
+            logger.error("[VOICA1] write_batch_log failed: %s", e)
+            logger.debug("[VOICA1] write_batch_log traceback", exc_info=True)
+
+
+def _flush_batch_logs() -> None:
+    """atexit: wachtrij leegschrijven zodat er geen batch log verloren gaat."""
+    with _LOG_THREAD_LOCK:
+        t = _LOG_THREAD
+    if t is not None and t.is_alive():
+        _LOG_QUEUE.put(None)
+        t.join(timeout=10)
+
+
+atexit.register(_flush_batch_logs)
+
+
+def queue_batch_log(base_dir: Path, device_type: str, password: str, created_files: List[Path]) -> None:
+    global _LOG_THREAD
+    with _LOG_THREAD_LOCK:
+        if _LOG_THREAD is None or not _LOG_THREAD.is_alive():
+            _LOG_THREAD = threading.Thread(target=_batch_log_writer, name="voica1-batch-log", daemon=True)
+            _LOG_THREAD.start()
+    _LOG_QUEUE.put((base_dir, device_type, password, list(created_files)))
+
 # =========================
 # Engine: OpenSSL
 # =========================
 
-def run_cmd(cmd: List[str], cwd: Optional[Path] = None) -> str:
+@lru_cache(maxsize=4)
+def _openssl_env(openssl_conf: Optional[str]) -> Dict[str, str]:
+    """
+    Environment voor openssl-processen, één keer per OPENSSL_CONF opgebouwd
+    i.p.v. os.environ.copy() bij elke aanroep.
+    """
     env = os.environ.copy()
-    if OPENSSL_CONF:
-        env["OPENSSL_CONF"] = OPENSSL_CONF
+    if openssl_conf:
+        env["OPENSSL_CONF"] = openssl_conf
+    return env
+
+def run_cmd(cmd: List[str], cwd: Optional[Path] = None) -> bytes:
+    """
+    stdout als bytes: geen universal-newlines/utf-8 decode per chunk; de
+    callers die tekst nodig hebben decoderen zelf (en enkel wat ze nodig hebben).
+    """
+    # Eén openssl-proces per commando: de interactieve modus (één blijvend
+    # proces met stdin-commando's) bestaat niet meer sinds OpenSSL 3.0.
+    env = _openssl_env(OPENSSL_CONF)
 
     logger.debug("[VOICA1] run_cmd: cwd=%r cmd=%r", str(cwd) if cwd else None, cmd)
     if OPENSSL_CONF:
@@ -230,7 +384,6 @@ def run_cmd(cmd: List[str], cwd: Optional[Path] = None) -> str:
             cmd,
             cwd=str(cwd) if cwd else None,
             capture_output=True,
-            text=True,
             env=env,
         )
     except FileNotFoundError as e:
@@ -244,60 +397,76 @@ def run_cmd(cmd: List[str], cwd: Optional[Path] = None) -> str:
         ) from e
 
     if result.returncode != 0:
+        stdout = result.stdout.decode("utf-8", "replace")
+        stderr = result.stderr.decode("utf-8", "replace")
         raise CommandError(
             f"Commando gefaald: {' '.join(cmd)}\n"
             f"OPENSSL_CONF={OPENSSL_CONF}\n"
             f"Returncode: {result.returncode}\n"
-            f"STDOUT:\n{result.stdout}\n\nSTDERR:\n{result.stderr}"
+            f"STDOUT:\n{stdout}\n\nSTDERR:\n{stderr}"
         )
 
     return result.stdout
 
-def openssl_create_key_and_csr(base_dir: Path, cn: str, key_size: int) -> Tuple[Path, Path]:
+def openssl_create_key_and_csr(base_dir: Path, cn: str, key_size: int, key_alg: str = "rsa") -> Tuple[Path, Path]:
     key_path = base_dir / f"{cn}.key.pem"
     csr_path = base_dir / f"{cn}.csr"
 
-    run_cmd([OPENSSL_BIN, "genrsa", "-out", str(key_path), str(int(key_size))])
+    if key_alg == "ec_p256":
+        newkey = ["-newkey", "ec", "-pkeyopt", "ec_paramgen_curve:P-256"]
+    else:
+        newkey = ["-newkey", f"rsa:{int(key_size)}"]
+
+    # key + CSR in één openssl-proces (i.p.v. genrsa + req): één spawn/init per toestel
     run_cmd([
         OPENSSL_BIN, "req", "-new",
-        "-key", str(key_path),
+        *newkey,
+        "-nodes",
+        "-keyout", str(key_path),
         "-subj", f"/CN={cn}",
         "-out", str(csr_path),
         "-sha256",
     ])
     return key_path, csr_path
 
+def openssl_extract(cert_path: Path) -> Tuple[Optional[str], bytes]:
+    """
+    CN + PEM (bytes) in één openssl-aanroep (PEM of DER in).
+    -subject met sep_multiline zet elk RDN op een eigen regel ("    CN=..."),
+    daarna volgt het certificaat als PEM op stdout.
+    """
+    out = run_cmd([
+        OPENSSL_BIN, "x509", "-in", str(cert_path),
+        "-subject", "-nameopt", "sep_multiline,sname,utf8",
+        "-outform", "PEM",
+    ])
+    head, marker, rest = out.partition(b"-----BEGIN CERTIFICATE-----")
+
+    # CN zoeken op bytes; enkel de gevonden waarde decoderen, de PEM blijft bytes
+    cn: Optional[str] = None
+    for line in head.splitlines():
+        line = line.strip()
+        if line.startswith(b"CN="):
+            cn = line[3:].strip().decode("utf-8", "replace") or None
+            break
+    return cn, (marker + rest) if marker else b""
+
 def openssl_parse_cert_cn(cert_path: Path) -> Optional[str]:
     try:
-        out = run_cmd([OPENSSL_BIN, "x509", "-in", str(cert_path), "-noout", "-subject"])
+        return openssl_extract(cert_path)[0]
     except CommandError:
         return None
 
-    line = out.strip()
-    if "CN=" not in line:
-        return None
-    idx = line.find("CN=")
-    cn_part = line[idx + 3:]
-    slash = cn_part.find("/")
-    if slash != -1:
-        cn_part = cn_part[:slash]
-    cn_part = cn_part.strip()
-    return cn_part or None
-
-def openssl_cert_to_pem_text(cert_path: Path) -> str:
-    # probeer utf-8 tekst
-    try:
-        txt = cert_path.read_text(encoding="utf-8")
-        if "BEGIN CERTIFICATE" in txt:
-            return txt
-    except UnicodeDecodeError:
-        pass
+def openssl_cert_to_pem_bytes(cert_path: Path) -> bytes:
+    # PEM is ASCII: gewoon de bytes gebruiken
+    data = cert_path.read_bytes()
+    if b"BEGIN CERTIFICATE" in data:
+        return data
 
     # DER -> PEM via openssl
-    out = run_cmd([OPENSSL_BIN, "x509", "-in", str(cert_path), "-outform", "PEM"])
-    return out
+    return run_cmd([OPENSSL_BIN, "x509", "-in", str(cert_path), "-outform", "PEM"])
 
-def openssl_create_p12(base_dir: Path, cn: str, password: str, cert_map: Dict[str, Path]) -> Path:
+def openssl_create_p12(base_dir: Path, cn: str, password: str, cert_map: Dict[str, CertEntry]) -> Path:
     key_path = base_dir / f"{cn}.key.pem"
     csr_path = base_dir / f"{cn}.csr"
     if not key_path.exists():
@@ -305,15 +474,15 @@ def openssl_create_p12(base_dir: Path, cn: str, password: str, cert_map: Dict[st
     if not csr_path.exists():
         raise CommandError(f"CSR niet gevonden: {csr_path}")
 
-    cert_path = cert_map.get(cn)
-    if not cert_path:
+    entry = cert_map.get(cn)
+    if not entry:
         raise CommandError(f"Geen certificaat gevonden in map voor CN {cn}")
 
     p12_path = base_dir / f"{cn}.p12"
     run_cmd([
         OPENSSL_BIN, "pkcs12", "-export",
         "-inkey", str(key_path),
-        "-in", str(cert_path),
+        "-in", str(entry.path),
         "-out", str(p12_path),
         "-passout", f"pass:{password}",
     ])
@@ -324,19 +493,40 @@ def openssl_create_p12(base_dir: Path, cn: str, password: str, cert_map: Dict[st
 # Engine: Python (cryptography)
 # =========================
 
-def _crypto_import():
+# sha256/no_encryption: stateloze instanties, één keer aangemaakt en gedeeld
+_CryptoMods = namedtuple("_CryptoMods", "x509 hashes serialization rsa ec pkcs12 NameOID sha256 no_encryption")
+
+@lru_cache(maxsize=None)
+def _crypto() -> Optional[_CryptoMods]:
+    """cryptography-modules één keer importeren (None als het pakket ontbreekt)."""
     try:
-        from cryptography import x509  # noqa
-        from cryptography.hazmat.primitives import hashes, serialization  # noqa
-        from cryptography.hazmat.primitives.asymmetric import rsa  # noqa
-        from cryptography.hazmat.primitives.serialization import pkcs12  # noqa
-        from cryptography.x509.oid import NameOID  # noqa
-        return True
+        from cryptography import x509
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import ec, rsa
+        from cryptography.hazmat.primitives.serialization import pkcs12
+        from cryptography.x509.oid import NameOID
     except Exception:
-        return False
+        return None
+    return _CryptoMods(
+        x509, hashes, serialization, rsa, ec, pkcs12, NameOID,
+        hashes.SHA256(), serialization.NoEncryption(),
+    )
+
+def _crypto_import() -> bool:
+    return _crypto() is not None
+
+def _require_crypto() -> _CryptoMods:
+    c = _crypto()
+    if c is None:
+        raise CommandError(
+            "Python engine vereist 'cryptography'.\n"
+            "Installeer: pip install cryptography\n"
+            "Of kies in de UI: Engine = OpenSSL."
+        )
+    return c
 
 def py_load_cert(cert_path: Path):
-    from cryptography import x509
+    x509 = _require_crypto().x509
     data = cert_path.read_bytes()
 
     # PEM?
@@ -348,61 +538,53 @@ def py_load_cert(cert_path: Path):
 def py_parse_cert_cn(cert_path: Path) -> Optional[str]:
     try:
         cert = py_load_cert(cert_path)
-        from cryptography.x509.oid import NameOID
-        attrs = cert.subject.get_attributes_for_oid(NameOID.COMMON_NAME)
+        attrs = cert.subject.get_attributes_for_oid(_crypto().NameOID.COMMON_NAME)
         if not attrs:
             return None
         return attrs[0].value
     except Exception:
         return None
 
-def py_cert_to_pem_text(cert_path: Path) -> str:
-    from cryptography.hazmat.primitives import serialization
+def py_cert_to_pem_bytes(cert_path: Path) -> bytes:
     cert = py_load_cert(cert_path)
-    return cert.public_bytes(serialization.Encoding.PEM).decode("utf-8")
-
-def py_create_key_and_csr(base_dir: Path, cn: str, key_size: int) -> Tuple[Path, Path]:
-    if not _crypto_import():
-        raise CommandError(
-            "Python engine vereist 'cryptography'.\n"
-            "Installeer: pip install cryptography\n"
-            "Of kies in de UI: Engine = OpenSSL."
-        )
+    return cert.public_bytes(_crypto().serialization.Encoding.PEM)
 
-    from cryptography import x509
-    from cryptography.hazmat.primitives import hashes, serialization
-    from cryptography.hazmat.primitives.asymmetric import rsa
-    from cryptography.x509.oid import NameOID
+def py_create_key_and_csr(base_dir: Path, cn: str, key_size: int, key_alg: str = "rsa") -> Tuple[Path, Path]:
+    c = _require_crypto()
+    x509, serialization = c.x509, c.serialization
 
     key_path = base_dir / f"{cn}.key.pem"
     csr_path = base_dir / f"{cn}.csr"
 
-    private_key = rsa.generate_private_key(public_exponent=65537, key_size=int(key_size))
+    if key_alg == "ec_p256":
+        private_key = c.ec.generate_private_key(c.ec.SECP256R1())
+    else:
+        private_key = c.rsa.generate_private_key(public_exponent=65537, key_size=int(key_size))
     key_pem = private_key.private_bytes(
         encoding=serialization.Encoding.PEM,
         format=serialization.PrivateFormat.TraditionalOpenSSL,
-        encryption_algorithm=serialization.NoEncryption(),
+        encryption_algorithm=c.no_encryption,
     )
     key_path.write_bytes(key_pem)
 
     csr = (
         x509.CertificateSigningRequestBuilder()
-        .subject_name(x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, cn)]))
-        .sign(private_key, hashes.SHA256())
+        .subject_name(x509.Name([x509.NameAttribute(c.NameOID.COMMON_NAME, cn)]))
+        .sign(private_key, c.sha256)
     )
     csr_path.write_bytes(csr.public_bytes(serialization.Encoding.PEM))
     return key_path, csr_path
 
-def py_create_p12(base_dir: Path, cn: str, password: str, cert_map: Dict[str, Path]) -> Path:
-    if not _crypto_import():
-        raise CommandError(
-            "Python engine vereist 'cryptography'.\n"
-            "Installeer: pip install cryptography\n"
-            "Of kies in de UI: Engine = OpenSSL."
-        )
+def py_p12_encryption(password: str):
+    """Versleuteling voor de .p12's: één keer per batch opbouwen, voor alle toestellen hergebruiken."""
+    return _require_crypto().serialization.BestAvailableEncryption(password.encode("utf-8"))
 
-    from cryptography.hazmat.primitives import serialization
-    from cryptography.hazmat.primitives.serialization import pkcs12
+
+def py_create_p12(
+    base_dir: Path, cn: str, password: str, cert_map: Dict[str, CertEntry], encryption: Any = None
+) -> Path:
+    c = _require_crypto()
+    serialization, pkcs12 = c.serialization, c.pkcs12
 
     key_path = base_dir / f"{cn}.key.pem"
     csr_path = base_dir / f"{cn}.csr"
@@ -411,22 +593,22 @@ def py_create_p12(base_dir: Path, cn: str, password: str, cert_map: Dict[str, Pa
     if not csr_path.exists():
         raise CommandError(f"CSR niet gevonden: {csr_path}")
 
-    cert_path = cert_map.get(cn)
-    if not cert_path:
+    entry = cert_map.get(cn)
+    if not entry:
         raise CommandError(f"Geen certificaat gevonden in map voor CN {cn}")
 
     # private key
     private_key = serialization.load_pem_private_key(key_path.read_bytes(), password=None)
 
-    # leaf cert
-    cert = py_load_cert(cert_path)
+    # leaf cert (al geparsed bij het scannen)
+    cert = entry.parsed if entry.parsed is not None else py_load_cert(entry.path)
 
     p12_bytes = pkcs12.serialize_key_and_certificates(
         name=cn.encode("utf-8"),
         key=private_key,
         cert=cert,
         cas=None,
-        encryption_algorithm=serialization.BestAvailableEncryption(password.encode("utf-8")),
+        encryption_algorithm=encryption if encryption is not None else py_p12_encryption(password),
     )
 
     p12_path = base_dir / f"{cn}.p12"
@@ -434,34 +616,208 @@ def py_create_p12(base_dir: Path, cn: str, password: str, cert_map: Dict[str, Pa
     return p12_path
 
 
+# =========================
+# Batch key/CSR generatie
+# =========================
+
+def _keygen_worker_init(voica_cfg: Dict[str, Any]) -> None:
+    """Worker-proces: zelfde config (openssl pad/conf) als het hoofdproces."""
+    logger.setLevel(logging.WARNING)
+    apply_voica_config(voica_cfg)
+
+def create_key_and_csr(base_dir: Path, cn: str, key_size: int, engine: str, key_alg: str = "rsa") -> Tuple[Path, Path]:
+    if engine == "openssl":
+        return openssl_create_key_and_csr(base_dir, cn, key_size, key_alg)
+    return py_create_key_and_csr(base_dir, cn, key_size, key_alg)
+
+_KEYGEN_POOL: Optional[ProcessPoolExecutor] = None
+_KEYGEN_POOL_LOCK = threading.Lock()
+
+
+def _keygen_workers() -> int:
+    return MAX_PARALLEL_KEYGEN or os.cpu_count() or 1
+
+
+def _keygen_pool() -> ProcessPoolExecutor:
+    """
+    Eén ProcessPool voor de hele levensduur van de app: workers opstarten
+    (interpreter + imports) gebeurt dan maar één keer i.p.v. per request.
+    """
+    global _KEYGEN_POOL
+    with _KEYGEN_POOL_LOCK:
+        if _KEYGEN_POOL is None:
+            _KEYGEN_POOL = ProcessPoolExecutor(
+                max_workers=_keygen_workers(),
+                initializer=_keygen_worker_init,
+                initargs=(VOICA_CFG,),
+            )
+        return _KEYGEN_POOL
+
+
+def _reset_keygen_pool(only: Optional[ProcessPoolExecutor] = None) -> None:
+    """
+    Bij nieuwe config (of afsluiten): workers hebben nog de oude config.
+    only = een kapotte pool: enkel die weggooien, niet een pool die een
+    andere request intussen al opnieuw aanmaakte.
+    """
+    global _KEYGEN_POOL
+    with _KEYGEN_POOL_LOCK:
+        if only is not None and _KEYGEN_POOL is not only:
+            return
+        pool, _KEYGEN_POOL = _KEYGEN_POOL, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(_reset_keygen_pool)
+
+
+def generate_all(
+    base_dir: Path, cns: List[str], key_size: int, engine: str, key_alg: str = "rsa"
+) -> List[Tuple[Optional[Tuple[Path, Path]], Optional[Exception]]]:
+    """
+    Key + CSR voor alle CN's parallel. RSA-keygen is CPU-bound: de Python engine
+    draait in de gedeelde ProcessPool (geen GIL), de OpenSSL engine start toch al
+    eigen processen, daar volstaan threads. Resultaat per CN in dezelfde
+    volgorde als cns: (paden, None) of (None, fout), zodat elke device zijn
+    eigen fout krijgt.
+    """
+    def collect(futures) -> List[Tuple[Optional[Tuple[Path, Path]], Optional[Exception]]]:
+        out = []
+        for f in futures:
+            try:
+                out.append((f.result(), None))
+            except Exception as e:
+                out.append((None, e))
+        return out
+
+    if len(cns) <= 1:
+        out = []
+        for cn in cns:
+            try:
+                out.append((create_key_and_csr(base_dir, cn, key_size, engine, key_alg), None))
+            except Exception as e:
+                out.append((None, e))
+        return out
+
+    if engine == "openssl":
+        with ThreadPoolExecutor(max_workers=min(len(cns), _keygen_workers())) as executor:
+            return collect([executor.submit(create_key_and_csr, base_dir, cn, key_size, engine, key_alg) for cn in cns])
+
+    def run_in_pool(todo: List[str]) -> Tuple[ProcessPoolExecutor, List[Tuple[Any, Optional[Exception]]]]:
+        pool = _keygen_pool()
+        try:
+            futures = [pool.submit(create_key_and_csr, base_dir, cn, key_size, engine, key_alg) for cn in todo]
+        except BrokenProcessPool as e:
+            return pool, [(None, e)] * len(todo)
+        return pool, collect(futures)
+
+    pool, out = run_in_pool(cns)
+
+    # worker gestorven (OOM, crash): pool is dan voorgoed 'broken'. Nieuwe pool
+    # en de getroffen CN's één keer opnieuw, anders faalt elke volgende batch.
+    broken = [i for i, (_, e) in enumerate(out) if isinstance(e, BrokenProcessPool)]
+    if broken:
+        logger.warning("[VOICA1] keygen pool broken, restarting it for %d CN(s)", len(broken))
+        _reset_keygen_pool(only=pool)
+        _, retried = run_in_pool([cns[i] for i in broken])
+        for i, res in zip(broken, retried):
+            out[i] = res
+    return out
+
+
 # =========================
 # Cert scanning / mapping
 # =========================
 
-def map_certs_by_cn(base_dir: Path, engine: str) -> Dict[str, Path]:
-    mapping: Dict[str, Path] = {}
-    if not base_dir.exists():
-        return mapping
+def _is_cert_name(name: str) -> bool:
+    """name = lowercase bestandsnaam; .csr/.p12/.pfx/.zip vallen al af op de extensie."""
+    ext = name.rpartition(".")[2]
+    if ext not in _CERT_EXT_SET:
+        return False
+    return not (ext == "pem" and name.endswith(_CERT_EXCLUDE_PEM))
 
-    for p in base_dir.iterdir():
-        if not p.is_file():
-            continue
 
-        name = p.name.lower()
-        if name.endswith(".key.pem") or name.endswith(".csr") or name.endswith(".p12") or name.endswith(".pfx"):
-            continue
-        if name.endswith(".zip") or name.endswith(".combined.pem"):
-            continue
-        if not name.endswith(CERT_EXTS):
-            continue
+def _scan_cert(p: Path, engine: str) -> Optional[CertEntry]:
+    parsed = None
+    pem = None
+    # ook bij de OpenSSL engine in-process parsen als cryptography er is: een
+    # openssl-proces per kandidaat-bestand domineert anders de scan
+    if engine == "openssl" and (USE_OPENSSL_PARSE or not _crypto_import()):
+        # CN en PEM in één keer: het combined-PEM-pad start geen tweede openssl
+        try:
+            cn, pem = openssl_extract(p)
+        except CommandError:
+            cn = None
+    else:
+        # cert-object bewaren: py_create_p12 / combined PEM parsen niet opnieuw
+        try:
+            parsed = py_load_cert(p)
+            attrs = parsed.subject.get_attributes_for_oid(_crypto().NameOID.COMMON_NAME)
+            cn = attrs[0].value if attrs else None
+        except Exception:
+            cn = None
+
+    if not cn:
+        return None
+    return CertEntry(path=p, cn=cn, pem=pem or None, parsed=parsed)
 
-        if engine == "openssl":
-            cn = openssl_parse_cert_cn(p)
+
+# (pad, engine) -> ((mtime_ns, size), CertEntry of None): een ongewijzigd bestand
+# wordt tussen requests niet opnieuw geparst, een nieuw/aangepast wel.
+_CERT_SCAN_CACHE: Dict[Tuple[str, str], Tuple[Tuple[int, int], Optional[CertEntry]]] = {}
+_CERT_SCAN_CACHE_MAX = 4096
+_CERT_SCAN_LOCK = threading.Lock()
+# (map, engine) -> (fingerprint van alle kandidaten, mapping); de mapping wordt
+# enkel gelezen door de callers
+_CERT_MAP_CACHE: Dict[Tuple[str, str], Tuple[Tuple, Dict[str, CertEntry]]] = {}
+_CERT_MAP_CACHE_MAX = 32
+
+
+def map_certs_by_cn(base_dir: Path, engine: str) -> Dict[str, CertEntry]:
+    mapping: Dict[str, CertEntry] = {}
+    if not base_dir.exists():
+        return mapping
+
+    # scandir: is_file() komt uit de directory-listing; enkel cert-kandidaten
+    # krijgen een stat (voor de cache-stempel)
+    with os.scandir(base_dir) as it:
+        candidates = []
+        for e in it:
+            if _is_cert_name(e.name.lower()) and e.is_file():
+                st = e.stat()
+                candidates.append((e.name, (st.st_mtime_ns, st.st_size)))
+
+    # hele mapping hergebruiken zolang geen enkele kandidaat veranderd is
+    # (resubmit van stap 2 op dezelfde map = enkel de scandir hierboven)
+    map_key = (str(base_dir), engine)
+    fingerprint = tuple(candidates)
+    with _CERT_SCAN_LOCK:
+        cached = _CERT_MAP_CACHE.get(map_key)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+
+    for fname, stamp in candidates:
+        p = base_dir / fname
+        key = (str(p), engine)
+        with _CERT_SCAN_LOCK:
+            hit = _CERT_SCAN_CACHE.get(key)
+        if hit is not None and hit[0] == stamp:
+            entry = hit[1]
         else:
-            cn = py_parse_cert_cn(p)
+            entry = _scan_cert(p, engine)
+            with _CERT_SCAN_LOCK:
+                if len(_CERT_SCAN_CACHE) >= _CERT_SCAN_CACHE_MAX:
+                    _CERT_SCAN_CACHE.clear()
+                _CERT_SCAN_CACHE[key] = (stamp, entry)
 
-        if cn and cn not in mapping:
-            mapping[cn] = p
+        if entry is not None and entry.cn not in mapping:
+            mapping[entry.cn] = entry
+
+    with _CERT_SCAN_LOCK:
+        if len(_CERT_MAP_CACHE) >= _CERT_MAP_CACHE_MAX:
+            _CERT_MAP_CACHE.clear()
+        _CERT_MAP_CACHE[map_key] = (fingerprint, mapping)
 
     logger.debug("[VOICA1] map_certs_by_cn: found CNs=%r", list(mapping.keys()))
     return mapping
@@ -471,7 +827,21 @@ def map_certs_by_cn(base_dir: Path, engine: str) -> Dict[str, Path]:
 # Output creation (.pem combined, zip)
 # =========================
 
-def create_combined_pem(base_dir: Path, cn: str, cert_map: Dict[str, Path], engine: str) -> Path:
+_COPY_BUFSIZE = 64 * 1024
+
+
+def _cert_pem_bytes(entry: CertEntry, engine: str) -> bytes:
+    """PEM van het certificaat (bytes), één keer berekend per CertEntry."""
+    if entry.pem is None:
+        if entry.parsed is not None:
+            entry.pem = entry.parsed.public_bytes(_crypto().serialization.Encoding.PEM)
+        elif engine == "openssl":
+            entry.pem = openssl_cert_to_pem_bytes(entry.path)
+        else:
+            entry.pem = py_cert_to_pem_bytes(entry.path)
+    return entry.pem
+
+def create_combined_pem(base_dir: Path, cn: str, cert_map: Dict[str, CertEntry], engine: str) -> Path:
     key_path = base_dir / f"{cn}.key.pem"
     csr_path = base_dir / f"{cn}.csr"
     if not key_path.exists():
@@ -479,75 +849,192 @@ def create_combined_pem(base_dir: Path, cn: str, cert_map: Dict[str, Path], engi
     if not csr_path.exists():
         raise CommandError(f"CSR niet gevonden: {csr_path}")
 
-    cert_path = cert_map.get(cn)
-    if not cert_path:
+    entry = cert_map.get(cn)
+    if not entry:
         raise CommandError(f"Geen certificaat gevonden in map voor CN {cn}")
 
     combined_path = base_dir / f"{cn}.pem"
 
-    key_txt = key_path.read_text(encoding="utf-8")
-
-    if engine == "openssl":
-        cert_pem = openssl_cert_to_pem_text(cert_path)
-    else:
-        cert_pem = py_cert_to_pem_text(cert_path)
-
-    combined = key_txt.rstrip() + "\n" + cert_pem.strip() + "\n"
-    combined_path.write_text(combined, encoding="utf-8")
+    # PEM is ASCII: bytes van begin tot eind, geen utf-8 decode/encode.
+    # De key wordt rechtstreeks doorgekopieerd i.p.v. eerst in het geheugen.
+    cert_bytes = _cert_pem_bytes(entry, engine)
+    with key_path.open("rb") as k, combined_path.open("wb") as out:
+        shutil.copyfileobj(k, out, _COPY_BUFSIZE)
+        if k.tell():
+            k.seek(-1, os.SEEK_END)
+            if k.read(1) != b"\n":
+                out.write(b"\n")
+        out.write(cert_bytes.strip() + b"\n")
     return combined_path
 
 
-def zip_pems(base_dir: Path, pem_files: List[Path], password: Optional[str]) -> Optional[Path]:
-    if not pem_files:
-        return None
-
-    zip_name = f"{base_dir.name}.zip"
-    zip_path = base_dir / zip_name
+def _write_pem_zip(fileobj, contents: List[Tuple[str, bytes]], password: Optional[str]) -> None:
+    """
+    Zip met de PEM's naar een (seekbaar) file-object, zie zip_pems.
+    ZIP_STORED: PEM is base64, deflate wint er weinig op en kost wel CPU.
+    Zip64 expliciet aan: grote batches mogen voorbij 65535 entries / 4 GiB.
+    """
+    if not password:
+        # zonder wachtwoord volstaat de stdlib, pyzipper is dan niet nodig
+        try:
+            with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_STORED, allowZip64=True) as zf:
+                for name, data in contents:
+                    zf.writestr(name, data)
+            return
+        except Exception as e:
+            raise CommandError(f"Fout bij maken ZIP: {e}")
 
-    # voorkeur: pyzipper (AES + wachtwoord)
+    # met wachtwoord: pyzipper (AES)
     try:
         import pyzipper  # type: ignore
-        with pyzipper.AESZipFile(
-            zip_path,
-            "w",
-            compression=pyzipper.ZIP_DEFLATED,
-            encryption=pyzipper.WZ_AES,
-        ) as zf:
-            if password:
-                zf.setpassword(password.encode("utf-8"))
-                zf.setencryption(pyzipper.WZ_AES, nbits=128)
-            for f in pem_files:
-                zf.write(f, arcname=f.name)
-        return zip_path
     except ImportError:
         raise CommandError(
             "Wachtwoord-zip voor phones vereist 'pyzipper'.\n"
             "Installeer: pip install pyzipper"
         )
+
+    try:
+        with pyzipper.AESZipFile(
+            fileobj,
+            "w",
+            compression=pyzipper.ZIP_STORED,
+            encryption=pyzipper.WZ_AES,
+            allowZip64=True,
+        ) as zf:
+            zf.setpassword(password.encode("utf-8"))
+            zf.setencryption(pyzipper.WZ_AES, nbits=128)
+            for name, data in contents:
+                zf.writestr(name, data)
     except Exception as e:
         raise CommandError(f"Fout bij maken ZIP: {e}")
 
 
+def zip_pems(base_dir: Path, pem_files: List[Path], password: Optional[str]) -> Optional[Path]:
+    if not pem_files:
+        return None
+
+    zip_name = f"{base_dir.name}.zip"
+    zip_path = base_dir / zip_name
+
+    # PEM's zijn klein: eerst allemaal inlezen, dan in één keer de zip in
+    # (writestr, geen stat/open per bestand binnen het zip-schrijven)
+    contents = [(f.name, f.read_bytes()) for f in pem_files]
+
+    if password:
+        # pyzipper-check vóór het openen: anders blijft er een lege zip achter
+        try:
+            import pyzipper  # type: ignore  # noqa: F401
+        except ImportError:
+            raise CommandError(
+                "Wachtwoord-zip voor phones vereist 'pyzipper'.\n"
+                "Installeer: pip install pyzipper"
+            )
+
+    # Zelf geopend met een buffer van 64 KiB: de vele kleine writes van de
+    # zip-writer (headers, AES-blokken) worden zo gebundeld.
+    with zip_path.open("wb", buffering=_COPY_BUFSIZE) as raw:
+        _write_pem_zip(raw, contents, password)
+    return zip_path
+
+
+def _use_openssl_p12(engine: str) -> bool:
+    # ook bij de OpenSSL engine in-process als cryptography er is: geen
+    # 'openssl pkcs12'-proces (spawn + key/cert opnieuw parsen) per toestel
+    return engine == "openssl" and (USE_OPENSSL_PKCS12 or not _crypto_import())
+
+
+def create_output(
+    base_dir: Path,
+    cn: str,
+    device_type: str,
+    engine: str,
+    password: str,
+    cert_map: Dict[str, CertEntry],
+    p12_encryption: Any = None,
+) -> Path:
+    """Stap 2 voor één CN: .p12 (pc) of combined .pem (ip_phone)."""
+    if device_type == "pc":
+        if _use_openssl_p12(engine):
+            return openssl_create_p12(base_dir, cn, password, cert_map)
+        return py_create_p12(base_dir, cn, password, cert_map, encryption=p12_encryption)
+    return create_combined_pem(base_dir, cn, cert_map, engine=engine)
+
+def create_all_outputs(
+    base_dir: Path, cns: List[str], device_type: str, engine: str, password: str, cert_map: Dict[str, CertEntry]
+) -> List[Tuple[Optional[Path], Optional[Exception]]]:
+    """
+    Stap 2 voor alle CN's parallel, resultaat in dezelfde volgorde als cns:
+    (pad, None) of (None, fout); de traceback zit in de fout zelf. Threads volstaan: de OpenSSL
+    engine draait in subprocessen en cryptography geeft de GIL vrij; cert_map
+    (met geparste certs) hoeft zo ook niet naar andere processen.
+    """
+    # wachtwoord-encode + BestAvailableEncryption één keer voor de hele batch
+    p12_encryption = None
+    if device_type == "pc" and cns and not _use_openssl_p12(engine):
+        try:
+            p12_encryption = py_p12_encryption(password)
+        except CommandError:
+            pass  # geen cryptography: de fout komt per toestel uit py_create_p12
+
+    def one(cn: str) -> Tuple[Optional[Path], Optional[Exception]]:
+        try:
+            return create_output(base_dir, cn, device_type, engine, password, cert_map, p12_encryption), None
+        except Exception as e:
+            return None, e
+
+    if len(cns) <= 1:
+        return [one(cn) for cn in cns]
+
+    with ThreadPoolExecutor(max_workers=min(len(cns), os.cpu_count() or 1)) as executor:
+        return list(executor.map(one, cns))
+
+
 # =========================
 # Messages blocks
 # =========================
 
+_BLOCK_START_RE = re.compile(r"\[\[(\w+)\]\]")
+_BLOCK_END = "[[END]]"
+
+
+@lru_cache(maxsize=8)
+def _parse_message_blocks(path_str: str, mtime_ns: int, size: int) -> Dict[str, str]:
+    """
+    Alle [[NAAM]] ... [[END]] blokken in één pass, gecachet per
+    (pad, mtime, grootte): een aangepast bestand wordt vanzelf opnieuw gelezen.
+    """
+    text = Path(path_str).read_text(encoding="utf-8")
+    blocks: Dict[str, str] = {}
+    for m in _BLOCK_START_RE.finditer(text):
+        name = m.group(1)
+        if name == "END" or name in blocks:
+            continue
+        end = text.find(_BLOCK_END, m.end())
+        blocks[name] = text[m.end():end if end != -1 else len(text)].strip()
+    return blocks
+
+
+def load_message_blocks(path: Path) -> Dict[str, str]:
+    """Alle blokken in één keer (één stat per request i.p.v. één per blok)."""
+    try:
+        st = path.stat()
+    except OSError:
+        return {}
+    return _parse_message_blocks(str(path), st.st_mtime_ns, st.st_size)
+
+
 def load_message_block(path: Path, block_name: str) -> str:
-    if not path.exists():
-        return ""
-    text = path.read_text(encoding="utf-8")
-    start_token = f"[[{block_name}]]"
-    end_token = "[[END]]"
-    if start_token not in text:
-        return ""
-    part = text.split(start_token, 1)[1]
-    part = part.split(end_token, 1)[0]
-    return part.strip()
+    return load_message_blocks(path).get(block_name, "")
+
+_PLACEHOLDER_RE = re.compile(r"\{\{(devices|password)\}\}")
 
 def render_template_text(template: str, devices: str, password: str) -> str:
+    # één pass over de template; een wachtwoord/device dat zelf "{{...}}"
+    # bevat wordt zo ook niet nog eens vervangen
     if not template:
         return ""
-    return template.replace("{{devices}}", devices).replace("{{password}}", password)
+    values = {"devices": devices, "password": password}
+    return _PLACEHOLDER_RE.sub(lambda m: values[m.group(1)], template)
 
 
 # =========================
@@ -705,7 +1192,14 @@ PAGE_TEMPLATE = """
               </select>
             </div>
             <div>
-              <label>Key size (bits)</label>
+              <label>Key type</label>
+              <select name="key_alg">
+                <option value="rsa" {% if key_alg == 'rsa' %}selected{% endif %}>RSA</option>
+                <option value="ec_p256" {% if key_alg == 'ec_p256' %}selected{% endif %}>ECDSA P-256 (snel)</option>
+              </select>
+            </div>
+            <div>
+              <label>Key size (bits, enkel RSA)</label>
               <select name="key_size">
                 <option value="2048" {% if key_size == 2048 %}selected{% endif %}>2048</option>
                 <option value="4096" {% if key_size == 4096 %}selected{% endif %}>4096</option>
@@ -732,6 +1226,7 @@ PAGE_TEMPLATE = """
           <input type="hidden" name="base_dir" value="{{ base_dir }}">
           <input type="hidden" name="device_type" value="{{ device_type }}">
           <input type="hidden" name="key_size" value="{{ key_size }}">
+          <input type="hidden" name="key_alg" value="{{ key_alg }}">
           <input type="hidden" name="devices" value="{{ devices_hidden }}">
           <input type="hidden" name="engine" value="{{ engine }}">
           <input type="hidden" name="debug" value="{{ 1 if debug_enabled else 0 }}">
@@ -783,6 +1278,10 @@ PAGE_TEMPLATE = """
 
         {% if zip_path %}
           <p class="muted">Phone ZIP: {{ zip_path }}</p>
+          <form method="post" action="/voica1/download_zip">
+            <input type="hidden" name="base_dir" value="{{ base_dir }}">
+            <button type="submit">Download ZIP</button>
+          </form>
         {% endif %}
       </div>
 
@@ -822,74 +1321,138 @@ PAGE_TEMPLATE = """
 """
 
 
-def _render(
-    *,
-    error: Optional[str],
-    base_dir: str,
-    device_type: str,
-    key_size: int,
-    devices_input: str,
-    devices_hidden: str,
-    step1_done: bool,
-    step2_done: bool,
-    devices_list: List[str],
-    cns: Dict[str, str],
-    devices_str: str,
-    password: str,
-    results: List[Dict[str, Any]],
-    zip_path: Optional[str],
-    certmail_text: str,
-    ots_text: str,
-    wa_text: str,
-    signal_text: str,
-    missing_certs: List[Dict[str, Any]],
-    engine: str,
-    debug_enabled: bool,
-):
+# autoescape=True = zelfde gedrag als Flask voor string-templates.
+_JINJA_ENV = Environment(autoescape=True)
+
+
+@lru_cache(maxsize=1)
+def _get_page_template() -> Template:
+    """
+    PAGE_TEMPLATE één keer compileren i.p.v. lex/parse/codegen per request
+    via render_template_string.
+    """
+    return _JINJA_ENV.from_string(PAGE_TEMPLATE)
+
+
+@lru_cache(maxsize=8)
+def _base_css_cached(colors_items: Tuple, ui_items: Tuple) -> str:
+    return cynit_layout.common_css({"colors": dict(colors_items), "ui": dict(ui_items)})
+
+
+def _base_css() -> str:
+    """
+    common_css hangt enkel af van colors/ui; gecachet op hun inhoud zodat een
+    thema-wijziging in SETTINGS meteen doorwerkt.
+    """
     colors = SETTINGS.get("colors", {})
     ui = SETTINGS.get("ui", {})
-    base_css = cynit_layout.common_css(SETTINGS)
-    common_js = cynit_layout.common_js()
+    try:
+        return _base_css_cached(tuple(sorted(colors.items())), tuple(sorted(ui.items())))
+    except (AttributeError, TypeError):
+        # niet-hashbare/afwijkende settings: gewoon opnieuw opbouwen
+        return cynit_layout.common_css(SETTINGS)
+
 
+@lru_cache(maxsize=1)
+def _common_js() -> str:
+    return cynit_layout.common_js()
+
+
+def _header_footer() -> Tuple[str, str]:
     header_html = cynit_layout.header_html(
         SETTINGS,
         tools=TOOLS,
         title="VOICA1 Certificaten",
         right_html="",
     )
-    footer_html = cynit_layout.footer_html()
-
-    return render_template_string(
-        PAGE_TEMPLATE,
-        base_css=base_css,
-        common_js=common_js,
-        header=header_html,
-        footer=footer_html,
-        colors=colors,
-        ui=ui,
-        error=error,
-        base_dir=base_dir,
-        root_base_dir=ROOT_BASE_DIR,
-        device_type=device_type,
-        key_size=key_size,
-        devices_input=devices_input,
-        devices_hidden=devices_hidden,
-        step1_done=step1_done,
-        step2_done=step2_done,
-        devices_list=devices_list,
-        cns=cns,
-        devices_str=devices_str,
-        password=password,
-        results=results,
-        zip_path=zip_path,
-        certmail_text=certmail_text,
-        ots_text=ots_text,
-        wa_text=wa_text,
-        signal_text=signal_text,
-        missing_certs=missing_certs,
-        engine=engine,
-        debug_enabled=debug_enabled,
+    return header_html, cynit_layout.footer_html()
+
+
+# Standaardwaarden voor alle pagina-velden; routes geven enkel door wat afwijkt.
+# Immutable lege waarden: de context wordt gedeeld tussen requests.
+_DEFAULT_CTX: Mapping[str, Any] = MappingProxyType({
+    "error": None,
+    "base_dir": "",
+    "device_type": "pc",
+    "devices_input": "",
+    "devices_hidden": "",
+    "step1_done": False,
+    "step2_done": False,
+    "devices_list": (),
+    "cns": MappingProxyType({}),
+    "devices_str": "",
+    "password": "",
+    "results": (),
+    "zip_path": None,
+    "certmail_text": "",
+    "ots_text": "",
+    "wa_text": "",
+    "signal_text": "",
+    "missing_certs": (),
+    "debug_enabled": False,
+})
+
+_STREAM_BUFFER = 64
+
+
+def _page_context(fields: Dict[str, Any]) -> Dict[str, Any]:
+    header_html, footer_html = _header_footer()
+    return {
+        **_DEFAULT_CTX,
+        "base_css": _base_css(),
+        "common_js": _common_js(),
+        "header": header_html,
+        "footer": footer_html,
+        "colors": SETTINGS.get("colors", {}),
+        "ui": SETTINGS.get("ui", {}),
+        "root_base_dir": ROOT_BASE_DIR,
+        # config-afhankelijk, dus niet in _DEFAULT_CTX
+        "key_size": KEY_SIZE_DEFAULT,
+        "key_alg": KEY_ALG_DEFAULT,
+        "engine": DEFAULT_ENGINE,
+        **fields,
+    }
+
+
+def _render(**fields: Any) -> Response:
+    """
+    Pagina streamen: de header/CSS gaan al weg terwijl de rest nog rendert.
+    Velden die niet meegegeven worden komen uit _DEFAULT_CTX.
+    """
+    stream = _get_page_template().stream(**_page_context(fields))
+    # kleine Jinja-events bundelen tot grotere chunks voor de socket
+    stream.enable_buffering(_STREAM_BUFFER)
+    return Response(stream_with_context(stream), mimetype="text/html")
+
+
+_INDEX_CACHE: Dict[Tuple, Tuple[bytes, str]] = {}
+_INDEX_CACHE_MAX = 16
+
+
+def _render_index(base_dir: str, debug_enabled: bool) -> Tuple[bytes, str]:
+    """
+    Lege startpagina (GET /voica1): hangt enkel af van base_dir, de defaults en
+    de layout. De volledige HTML wordt gecachet; header/footer/kleuren zitten
+    in de key zodat een thema- of toolwijziging meteen doorwerkt.
+    Geeft (html-bytes, etag) terug.
+    """
+    header_html, footer_html = _header_footer()
+    key = (
+        base_dir, KEY_SIZE_DEFAULT, KEY_ALG_DEFAULT, DEFAULT_ENGINE, ROOT_BASE_DIR, debug_enabled,
+        repr(SETTINGS.get("colors", {})), repr(SETTINGS.get("ui", {})),
+        header_html, footer_html,
     )
+    hit = _INDEX_CACHE.get(key)
+    if hit is None:
+        html = _get_page_template().render(**_page_context({
+            "base_dir": base_dir,
+            "debug_enabled": debug_enabled,
+        })).encode("utf-8")
+        hit = (html, hashlib.blake2b(html, digest_size=16).hexdigest())
+        if len(_INDEX_CACHE) >= _INDEX_CACHE_MAX:
+            _INDEX_CACHE.clear()
+        _INDEX_CACHE[key] = hit
+    return hit
 
 
 # =========================
@@ -901,35 +1464,20 @@ def register_web_routes(app, settings, tools, voica_cfg):
     SETTINGS = settings or {}
     TOOLS = tools or []
     apply_voica_config(voica_cfg or {})
+    # bestaande keygen-workers draaien nog met de vorige config
+    _reset_keygen_pool()
 
     @app.route("/voica1", methods=["GET"])
     def voica1_index():
         debug_enabled = DEBUG_DEFAULT
         set_debug_enabled(debug_enabled)
 
-        return _render(
-            error=None,
-            base_dir=compute_default_base_dir(),
-            device_type="pc",
-            key_size=KEY_SIZE_DEFAULT,
-            devices_input="",
-            devices_hidden="",
-            step1_done=False,
-            step2_done=False,
-            devices_list=[],
-            cns={},
-            devices_str="",
-            password="",
-            results=[],
-            zip_path=None,
-            certmail_text="",
-            ots_text="",
-            wa_text="",
-            signal_text="",
-            missing_certs=[],
-            engine=DEFAULT_ENGINE,
-            debug_enabled=debug_enabled,
-        )
+        html, etag = _render_index(compute_default_base_dir(), debug_enabled)
+        # ongewijzigde startpagina: 304 zonder body
+        resp = Response(html, mimetype="text/html")
+        resp.set_etag(etag)
+        resp.headers["Cache-Control"] = "private, no-cache"
+        return resp.make_conditional(request)
 
     @app.route("/voica1/generate", methods=["POST"])
     def voica1_generate():
@@ -948,31 +1496,21 @@ def register_web_routes(app, settings, tools, voica_cfg):
         except Exception:
             key_size = KEY_SIZE_DEFAULT
 
+        key_alg = (request.form.get("key_alg") or KEY_ALG_DEFAULT).strip().lower()
+        if key_alg not in KEY_ALGS:
+            key_alg = KEY_ALG_DEFAULT
+
         if engine not in ("python", "openssl"):
             engine = "python"
 
         if not base_dir_str:
-            error = "Map is verplicht."
             return _render(
-                error=error,
+                error="Map is verplicht.",
                 base_dir=compute_default_base_dir(),
                 device_type=device_type,
                 key_size=key_size,
+                key_alg=key_alg,
                 devices_input=devices_raw,
-                devices_hidden="",
-                step1_done=False,
-                step2_done=False,
-                devices_list=[],
-                cns={},
-                devices_str="",
-                password="",
-                results=[],
-                zip_path=None,
-                certmail_text="",
-                ots_text="",
-                wa_text="",
-                signal_text="",
-                missing_certs=[],
                 engine=engine,
                 debug_enabled=debug_enabled,
             )
@@ -982,27 +1520,13 @@ def register_web_routes(app, settings, tools, voica_cfg):
 
         devices = [line.strip() for line in devices_raw.splitlines() if line.strip()]
         if not devices:
-            error = "Voer minstens één device in."
             return _render(
-                error=error,
+                error="Voer minstens één device in.",
                 base_dir=str(base_dir),
                 device_type=device_type,
                 key_size=key_size,
+                key_alg=key_alg,
                 devices_input=devices_raw,
-                devices_hidden="",
-                step1_done=False,
-                step2_done=False,
-                devices_list=[],
-                cns={},
-                devices_str="",
-                password="",
-                results=[],
-                zip_path=None,
-                certmail_text="",
-                ots_text="",
-                wa_text="",
-                signal_text="",
-                missing_certs=[],
                 engine=engine,
                 debug_enabled=debug_enabled,
             )
@@ -1014,16 +1538,18 @@ def register_web_routes(app, settings, tools, voica_cfg):
         dev_list: List[str] = []
 
         try:
-            for dev in devices:
-                dev_id = validate_device_id(dev)
-                cn = build_cn(dev_id, device_type)
-                cns[dev_id] = cn
-                dev_list.append(dev_id)
-
-                if engine == "openssl":
-                    openssl_create_key_and_csr(base_dir, cn, key_size)
-                else:
-                    py_create_key_and_csr(base_dir, cn, key_size)
+            dev_list = [validate_device_id(dev) for dev in devices]
+            cns = {dev_id: build_cn(dev_id, device_type) for dev_id in dev_list}
+
+            results = generate_all(base_dir, [cns[d] for d in dev_list], key_size, engine, key_alg)
+            failed = [(dev_id, e) for dev_id, (_, e) in zip(dev_list, results) if e is not None]
+            if failed:
+                lines = []
+                for dev_id, e in failed:
+                    logger.error("[VOICA1] generate failed for %r: %s", dev_id, e)
+                    logger.debug("[VOICA1] generate traceback for %r", dev_id, exc_info=e)
+                    lines.append(f"{dev_id}: {e}" + (f"\n{_format_tb(e)}" if debug_enabled else ""))
+                error = "Fout bij aanmaken key/CSR:\n" + "\n".join(lines)
 
         except Exception as e:
             if debug_enabled:
@@ -1031,7 +1557,7 @@ def register_web_routes(app, settings, tools, voica_cfg):
             else:
                 error = f"Fout bij aanmaken key/CSR: {e}"
             logger.error("[VOICA1] generate failed: %s", e)
-            logger.debug(traceback.format_exc())
+            logger.debug("[VOICA1] generate traceback", exc_info=True)
 
         devices_str = build_devices_string(dev_list)
         devices_hidden = "\n".join(dev_list)
@@ -1041,21 +1567,14 @@ def register_web_routes(app, settings, tools, voica_cfg):
             base_dir=str(base_dir),
             device_type=device_type,
             key_size=key_size,
-            devices_input="\n".join(dev_list),
+            key_alg=key_alg,
+            devices_input=devices_hidden,
             devices_hidden=devices_hidden,
             step1_done=True,
-            step2_done=False,
             devices_list=dev_list,
             cns=cns,
             devices_str=devices_str,
             password=password,
-            results=[],
-            zip_path=None,
-            certmail_text="",
-            ots_text="",
-            wa_text="",
-            signal_text="",
-            missing_certs=[],
             engine=engine,
             debug_enabled=debug_enabled,
         )
@@ -1078,11 +1597,16 @@ def register_web_routes(app, settings, tools, voica_cfg):
         except Exception:
             key_size = KEY_SIZE_DEFAULT
 
+        key_alg = (request.form.get("key_alg") or KEY_ALG_DEFAULT).strip().lower()
+        if key_alg not in KEY_ALGS:
+            key_alg = KEY_ALG_DEFAULT
+
         if engine not in ("python", "openssl"):
             engine = "python"
 
         base_dir = Path(base_dir_str)
         devices = [line.strip() for line in devices_hidden.splitlines() if line.strip()]
+        # CN één keer per device opbouwen, daarna overal hergebruiken
         cns = {d: build_cn(d, device_type) for d in devices}
         devices_str = build_devices_string(devices)
 
@@ -1090,35 +1614,28 @@ def register_web_routes(app, settings, tools, voica_cfg):
 
         results: List[Dict[str, Any]] = []
         pem_files: List[Path] = []
-        missing_certs: List[Dict[str, Any]] = []
         created_files: List[Path] = []
 
         # missing certs
-        for dev in devices:
-            cn = build_cn(dev, device_type)
-            if cn not in cert_map:
-                missing_certs.append({"device": dev, "cn": cn})
+        missing_certs: List[Dict[str, Any]] = [
+            {"device": dev, "cn": cns[dev]} for dev in devices if cns[dev] not in cert_map
+        ]
 
-        for dev in devices:
-            cn = build_cn(dev, device_type)
-            try:
+        outputs = create_all_outputs(
+            base_dir, [cns[d] for d in devices], device_type, engine, password, cert_map
+        )
+        for dev, (out, e) in zip(devices, outputs):
+            if e is None:
+                created_files.append(out)
                 if device_type == "pc":
-                    if engine == "openssl":
-                        out = openssl_create_p12(base_dir, cn, password, cert_map)
-                    else:
-                        out = py_create_p12(base_dir, cn, password, cert_map)
-                    created_files.append(out)
                     results.append({"device": dev, "ok": True, "message": f".p12 aangemaakt: {out.name}"})
                 else:
-                    pem = create_combined_pem(base_dir, cn, cert_map, engine=engine)
-                    pem_files.append(pem)
-                    created_files.append(pem)
-                    results.append({"device": dev, "ok": True, "message": f"PEM aangemaakt: {pem.name}"})
-
-            except Exception as e:
+                    pem_files.append(out)
+                    results.append({"device": dev, "ok": True, "message": f"PEM aangemaakt: {out.name}"})
+            else:
                 logger.error("[VOICA1] process error for %r: %s", dev, e)
-                logger.debug(traceback.format_exc())
-                msg = str(e) if not debug_enabled else (str(e) + "\n" + traceback.format_exc())
+                logger.debug("[VOICA1] process traceback for %r", dev, exc_info=e)
+                msg = str(e) if not debug_enabled else (str(e) + "\n" + _format_tb(e))
                 results.append({"device": dev, "ok": False, "message": msg})
 
         zip_path_str = None
@@ -1130,33 +1647,32 @@ def register_web_routes(app, settings, tools, voica_cfg):
                     zip_path_str = str(zip_path)
             except Exception as e:
                 logger.error("[VOICA1] zip failed: %s", e)
-                logger.debug(traceback.format_exc())
+                logger.debug("[VOICA1] zip traceback", exc_info=True)
                 results.append({"device": "(zip)", "ok": False, "message": str(e)})
 
         # mail texts
-        certmail_template = load_message_block(MESSAGES_PATH, "CERTMAIL")
-        ots_template = load_message_block(MESSAGES_PATH, "OTS")
-        wa_template = load_message_block(MESSAGES_PATH, "WA")
-        signal_template = load_message_block(MESSAGES_PATH, "SIGNAL")
+        blocks = load_message_blocks(MESSAGES_PATH)
+        certmail_template = blocks.get("CERTMAIL", "")
+        ots_template = blocks.get("OTS", "")
+        wa_template = blocks.get("WA", "")
+        signal_template = blocks.get("SIGNAL", "")
 
         certmail_text = render_template_text(certmail_template, devices_str, password)
         ots_text = render_template_text(ots_template, devices_str, password)
         wa_text = render_template_text(wa_template, devices_str, password)
         signal_text = render_template_text(signal_template, devices_str, password)
 
-        # batch log
-        try:
-            write_batch_log(base_dir, device_type, password, created_files)
-        except Exception as e:
-            logger.error("[VOICA1] write_batch_log failed: %s", e)
-            logger.debug(traceback.format_exc())
+        # batch log: op de achtergrond, de response wacht niet op de schijf
+        queue_batch_log(base_dir, device_type, password, created_files)
 
         return _render(
             error=error,
             base_dir=str(base_dir),
             device_type=device_type,
             key_size=key_size,
-            devices_input="\n".join(devices),
+            key_alg=key_alg,
+            # het hidden veld komt al als "\n"-lijst binnen: niet opnieuw joinen
+            devices_input=devices_hidden,
             devices_hidden=devices_hidden,
             step1_done=True,
             step2_done=True,
@@ -1175,6 +1691,26 @@ def register_web_routes(app, settings, tools, voica_cfg):
             debug_enabled=debug_enabled,
         )
 
+    @app.route("/voica1/download_zip", methods=["POST"])
+    def voica1_download_zip():
+        """
+        De phone-zip die stap 2 al (met het batchwachtwoord) aanmaakte. Er wordt
+        hier niets opnieuw gezipt: de client kiest dus geen wachtwoord of inhoud.
+        """
+        base_dir_str = (request.form.get("base_dir") or "").strip()
+
+        # niets buiten de VOICA1-root serveren (ook niet via '..' of een symlink)
+        root = Path(ROOT_BASE_DIR).resolve()
+        base_dir = Path(base_dir_str).resolve()
+        if not base_dir_str or not base_dir.is_relative_to(root):
+            return Response("Map ligt buiten de VOICA1 root.", status=400, mimetype="text/plain")
+
+        zip_path = base_dir / f"{base_dir.name}.zip"
+        if not zip_path.is_file():
+            return Response("Geen ZIP gevonden voor deze batch.", status=404, mimetype="text/plain")
+
+        return send_file(zip_path, mimetype="application/zip", as_attachment=True, download_name=zip_path.name)
+
 
 # =========================
 # Standalone run
@@ -1195,4 +1731,6 @@ if __name__ == "__main__":
 
     app = Flask(__name__)
     register_web_routes(app, settings, tools, voica_cfg)
-    app.run(host="127.0.0.1", port=5445, debug=True)
+    # geen reloader/debugger: die forkt het proces en gooit de keygen-pool en
+    # caches weg; threaded zodat requests elkaar niet blokkeren
+    app.run(host="127.0.0.1", port=5445, debug=False, threaded=True, use_reloader=False)